@@ -0,0 +1,151 @@
+"""
+Catalog cache backends
+
+MemoryCache is a size-bounded LRU with per-entry TTL living in the worker
+process. RedisCache stores the same entries in any Redis-compatible server
+so every worker shares them. Both expose the same async interface and
+hit/miss/eviction counters.
+"""
+
+import time
+from collections import OrderedDict
+
+from bson import json_util
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional shared backend
+    redis = None
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+class MemoryCache:
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.stats = CacheStats()
+
+    async def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    async def get_many(self, keys):
+        return [await self.get(key) for key in keys]
+
+    def record_miss(self, count: int = 1):
+        """Count lookups the caller answered without asking the cache"""
+        self.stats.misses += count
+
+    async def set(self, key: str, value):
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def delete(self, key: str):
+        if self.entries.pop(key, None) is not None:
+            self.stats.invalidations += 1
+
+    async def invalidate(self, prefix: str):
+        for key in [key for key in self.entries if key.startswith(prefix)]:
+            del self.entries[key]
+            self.stats.invalidations += 1
+
+    async def clear(self):
+        self.entries.clear()
+
+    def info(self):
+        return {"backend": self.backend, "entries": len(self.entries),
+                "max_entries": self.max_entries, **self.stats.as_dict()}
+
+class RedisCache:
+    """Shared cache on a Redis-compatible server; eviction is left to its maxmemory policy"""
+
+    backend = "redis"
+
+    def __init__(self, client, ttl: float = 60.0, namespace: str = "catalog:"):
+        self.client = client
+        self.ttl = ttl
+        self.namespace = namespace
+        self.stats = CacheStats()
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs):
+        if redis is None:
+            raise RuntimeError("CATALOG_CACHE_REDIS_URL is set but the redis package is not installed")
+        return cls(redis.from_url(url), **kwargs)
+
+    async def get(self, key: str):
+        raw = await self.client.get(self.namespace + key)
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return json_util.loads(raw)
+
+    async def get_many(self, keys):
+        if not keys:
+            return []
+        values = []
+        for raw in await self.client.mget([self.namespace + key for key in keys]):
+            if raw is None:
+                self.stats.misses += 1
+                values.append(None)
+            else:
+                self.stats.hits += 1
+                values.append(json_util.loads(raw))
+        return values
+
+    def record_miss(self, count: int = 1):
+        """Count lookups the caller answered without asking the cache"""
+        self.stats.misses += count
+
+    async def set(self, key: str, value):
+        await self.client.set(self.namespace + key, json_util.dumps(value), px=int(self.ttl * 1000))
+
+    async def delete(self, key: str):
+        self.stats.invalidations += await self.client.delete(self.namespace + key)
+
+    async def invalidate(self, prefix: str):
+        keys = [key async for key in self.client.scan_iter(match=self.namespace + prefix + "*")]
+        if keys:
+            await self.client.delete(*keys)
+            self.stats.invalidations += len(keys)
+
+    async def clear(self):
+        await self.invalidate("")
+
+    def info(self):
+        return {"backend": self.backend, **self.stats.as_dict()}
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Index audit for the Netflix Clone database
+Reports registry indexes that are missing, indexes nobody uses, and checks
+that the hot queries are planned as index scans rather than collection scans.
+"""
+
+import argparse
+import sys
+
+from pymongo import MongoClient
+
+from server import INDEXES, MONGO_DB_NAME, MONGO_URL
+
+# (collection, filter, acceptable index names) for queries the API runs
+QUERY_PLANS = [
+    ("users", {"email": "probe@example.com"}, ("email_unique",)),
+    ("users", {"id": "probe"}, ("id_unique",)),
+    ("profiles", {"user_id": "probe"}, ("user_created_at",)),
+    ("watchlist_items", {"profile_id": "probe", "content_id": "probe"}, ("profile_content_unique",)),
+    ("watchlist_items", {"profile_id": "probe"}, ("profile_added_at", "profile_content_unique")),
+    ("content", {"id": "probe"}, ("id_unique",)),
+    ("content", {"id": {"$in": ["probe-1", "probe-2"]}}, ("id_unique",)),
+    ("content", {"content_type": "movie"}, ("type_rating_id", "type_genre_rating_id")),
+    ("content", {"content_type": "series", "genre": "Action"}, ("type_genre_rating_id", "type_rating_id")),
+    ("content", {"genre": {"$in": ["Animation", "Family"]}}, ("genre_rating_id", "genre_year")),
+]
+
+def plan_stages(plan):
+    """Yield every (stage, indexName) pair in an explain plan tree"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"], plan.get("indexName")
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from plan_stages(item)
+
+def find_missing(db):
+    missing = []
+    for collection, indexes in INDEXES.items():
+        existing = db[collection].index_information()
+        for index in indexes:
+            spec = index.document
+            found = existing.get(spec["name"])
+            if not found or dict(found["key"]) != dict(spec["key"]):
+                missing.append((collection, spec["name"]))
+    return missing
+
+def find_unused(db):
+    unused = []
+    for collection, indexes in INDEXES.items():
+        registered = {index.document["name"] for index in indexes}
+        for stats in db[collection].aggregate([{"$indexStats": {}}]):
+            name = stats["name"]
+            if name == "_id_":
+                continue
+            if name not in registered:
+                unused.append((collection, name, "not in registry"))
+            elif stats["accesses"]["ops"] == 0:
+                unused.append((collection, name, "no recorded accesses"))
+    return unused
+
+def check_query_plans(db):
+    failures = []
+    for collection, query, expected in QUERY_PLANS:
+        explain = db[collection].find(query).explain()
+        stages = list(plan_stages(explain["queryPlanner"]["winningPlan"]))
+        used = {name for stage, name in stages if stage == "IXSCAN"}
+        if any(stage == "COLLSCAN" for stage, _ in stages) or not used & set(expected):
+            failures.append((collection, query, sorted(used) or ["COLLSCAN"]))
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=MONGO_URL)
+    parser.add_argument("--database", default=MONGO_DB_NAME)
+    parser.add_argument("--skip-explain", action="store_true", help="only report missing/unused indexes")
+    args = parser.parse_args()
+
+    db = MongoClient(args.url)[args.database]
+    ok = True
+
+    missing = find_missing(db)
+    for collection, name in missing:
+        print(f"❌ MISSING  {collection}.{name}")
+    ok = ok and not missing
+
+    for collection, name, reason in find_unused(db):
+        print(f"⚠️  UNUSED   {collection}.{name} ({reason})")
+
+    if not args.skip_explain:
+        failures = check_query_plans(db)
+        for collection, query, used in failures:
+            print(f"❌ PLAN     {collection} {query} -> {', '.join(used)}")
+        ok = ok and not failures
+
+    print("✅ Index check passed" if ok else "⚠️  Index check failed")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
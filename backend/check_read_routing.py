@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Read routing check against a replica set
+Runs the app in-process on a scratch database, drives a few catalog and user
+requests, and records which member served every read: catalog and search
+reads must land on a secondary, auth/profile/watchlist reads on the primary.
+With --user-read-preference secondary it instead checks that causal sessions
+still give read-your-writes for watchlists read from secondaries.
+
+A local three-node replica set for this:
+
+    for port in 27017 27018 27019; do
+        mkdir -p /tmp/rs0-$port
+        mongod --replSet rs0 --port $port --dbpath /tmp/rs0-$port --bind_ip localhost --fork \\
+               --logpath /tmp/rs0-$port/mongod.log
+    done
+    mongosh --port 27017 --eval 'rs.initiate({_id: "rs0", members: [
+        {_id: 0, host: "localhost:27017"}, {_id: 1, host: "localhost:27018"},
+        {_id: 2, host: "localhost:27019"}]})'
+
+    python check_read_routing.py --url "mongodb://localhost:27017,localhost:27018,localhost:27019/?replicaSet=rs0"
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+from collections import defaultdict
+
+import httpx
+from pymongo import MongoClient, monitoring
+
+CATALOG_COLLECTIONS = {"content", "rankings"}
+USER_COLLECTIONS = {"users", "profiles", "watchlist_items"}
+READ_COMMANDS = {"find", "aggregate", "count", "distinct"}
+
+class ReadRecorder(monitoring.CommandListener):
+    """Which server each read command went to, by collection"""
+
+    def __init__(self):
+        self.reads = defaultdict(set)
+        self.lock = threading.Lock()
+        self.recording = False  # startup work (index builds, ranking rebuilds) reads the primary on purpose
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if self.recording and event.command_name in READ_COMMANDS and isinstance(collection, str):
+            with self.lock:
+                self.reads[collection].add("%s:%s" % event.connection_id)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+async def drive(server, recorder):
+    """Catalog and user traffic through the real routes"""
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://routing") as client:
+        response = await client.post("/api/auth/register", json={
+            "email": "routing@example.com", "password": "routing-check", "full_name": "Routing"
+        })
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        profile_id = (await client.post("/api/profiles", json={"name": "Routing"}, headers=headers)).json()["id"]
+        movie = {"title": "Routing Check", "description": "d", "genre": "Drama", "year": 2024, "rating": 4.0,
+                 "image_url": "x", "trailer_url": "y", "duration": 90}
+        movie_id = (await client.post("/api/movies", json=movie, headers=headers)).json()["id"]
+
+        recorder.recording = True
+
+        await client.get("/api/movies", params={"genre": "Drama"})
+        await client.get(f"/api/movies/{movie_id}")
+        await client.get("/api/rankings/top_rated")
+        await client.get("/api/browse", headers=headers)
+
+        # Read-your-writes: the watchlist must show the title straight after adding it
+        await client.post(f"/api/watchlist/{profile_id}/{movie_id}", headers=headers)
+        watchlist = (await client.get(f"/api/watchlist/{profile_id}", headers=headers)).json()
+        return movie_id in [item["id"] for item in watchlist]
+
+async def run(args, recorder):
+    import server
+    server.MONGO_URL = args.url
+    server.MONGO_DB_NAME = args.database
+    server.MONGO_READ_PREFERENCE = args.user_read_preference
+    server.CAUSAL_USER_SESSIONS = args.user_read_preference != "primary"
+    server.RATE_LIMIT_ENABLED = False
+    # The watchlist flush re-reads titles from the primary by design; keep it out of the run
+    server.RANKING_FLUSH_SECONDS = 3600
+
+    async with server.lifespan(server.app):
+        try:
+            return await drive(server, recorder)
+        finally:
+            await server.client.drop_database(args.database)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="replica set connection string")
+    parser.add_argument("--database", default="netflix_clone_routing")
+    parser.add_argument("--user-read-preference", default="primary",
+                        choices=["primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"])
+    args = parser.parse_args()
+    if args.database == "netflix_clone":
+        raise SystemExit("❌ Refusing to run against the application database")
+
+    topology = MongoClient(args.url, serverSelectionTimeoutMS=5000)
+    topology.admin.command("ping")
+    primary = "%s:%s" % topology.primary if topology.primary else None
+    secondaries = {"%s:%s" % address for address in topology.secondaries}
+    topology.close()
+    if not primary or not secondaries:
+        print("❌ Need a replica set with a primary and at least one secondary")
+        return 1
+    print(f"🗺️  primary {primary}, secondaries {', '.join(sorted(secondaries))}")
+
+    recorder = ReadRecorder()
+    monitoring.register(recorder)  # applies to clients created from here on
+    read_your_writes = asyncio.run(run(args, recorder))
+
+    ok = True
+    for collection, servers in sorted(recorder.reads.items()):
+        if collection in CATALOG_COLLECTIONS:
+            expected, where = secondaries, "a secondary"
+        elif collection in USER_COLLECTIONS and args.user_read_preference == "primary":
+            expected, where = {primary}, "the primary"
+        else:
+            print(f"   {collection:<16} read from {', '.join(sorted(servers))}")
+            continue
+        if servers <= expected:
+            print(f"✅ {collection:<16} read from {where}")
+        else:
+            print(f"❌ {collection:<16} read from {', '.join(sorted(servers))}, expected {where}")
+            ok = False
+
+    if read_your_writes:
+        print("✅ Watchlist read saw the write that preceded it")
+    else:
+        print("❌ Watchlist read missed the write that preceded it")
+        ok = False
+
+    print("✅ Read routing check passed" if ok else "⚠️  Read routing check failed")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Response compression
+
+CompressionMiddleware negotiates brotli or gzip from Accept-Encoding and
+compresses complete JSON/text responses above a size threshold; streamed
+responses (more than one body chunk) and event streams pass through as
+they are. When the scope carries a cache key (set by the conditional GET
+middleware for catalog reads, derived from the ETag) the encoded bytes are
+stored in the given cache so repeat hits never touch the handler, the JSON
+encoder or the compressor.
+"""
+
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only without it
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+NEVER_COMPRESS = ("text/event-stream",)
+
+def available_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def negotiate(accept_encoding: str, encodings=None):
+    """The best encoding the client accepts, preferring the order of `encodings`; None for identity"""
+    encodings = encodings or available_encodings()
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            weights[name.strip().lower()] = q
+    best = None
+    for encoding in encodings:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (encoding, q)
+    return best[0] if best else None
+
+def encode(body: bytes, encoding: str, level: int):
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+def is_compressible(headers: Headers):
+    content_type = headers.get("content-type", "")
+    return (
+        "content-encoding" not in headers
+        and content_type.startswith(COMPRESSIBLE_TYPES)
+        and not content_type.startswith(NEVER_COMPRESS)
+    )
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, levels=None, cached_levels=None, cache=None):
+        self.app = app
+        self.minimum_size = minimum_size
+        # Per-response levels stay cheap; cached payloads are encoded once, so they can afford more
+        self.levels = levels or {"br": 4, "gzip": 5}
+        self.cached_levels = cached_levels or {"br": 9, "gzip": 9}
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        start = None
+        streaming = False
+
+        async def send_compressed(message):
+            nonlocal start, streaming
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if streaming or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            compressible = is_compressible(headers)
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            if encoding is None or not compressible or message.get("more_body") or len(body) < self.minimum_size:
+                streaming = True
+                await send(start)
+                await send(message)
+                return
+
+            cache_key = scope.get("encoded_cache_key")
+            cache = self.cache if cache_key and start["status"] == 200 else None
+            body = encode(body, encoding, (self.cached_levels if cache else self.levels)[encoding])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            if cache is not None:
+                stored = {key: value for key, value in headers.items() if key != "content-length"}
+                await cache.set(f"{cache_key}:{encoding}", (body, stored))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,151 @@
+"""
+Change events for server-sent event streams
+
+EventBus fans published events out to the subscriptions listening on
+their topic ("catalog", or "profile:<id>" for one profile's watchlist).
+Every subscription has a bounded queue: a client that stops reading does
+not hold memory or slow publishers down. It loses its backlog and gets a
+single "resync" event, which tells it to refetch instead. The bus also
+keeps a short history, so a client that reconnects with Last-Event-ID
+gets what it missed (or a resync when that is no longer available).
+
+With one worker the endpoints publish straight into the bus. With several,
+follow_changes() tails Mongo change streams so every worker's bus sees
+every write.
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+
+import orjson
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+class Event:
+    __slots__ = ("id", "sequence", "topic", "type", "data")
+
+    def __init__(self, sequence: int, instance: str, topic: str, type: str, data):
+        self.sequence = sequence
+        self.id = f"{instance}-{sequence}"
+        self.topic = topic
+        self.type = type
+        self.data = data
+
+    def encode(self) -> bytes:
+        return b"id: %s\nevent: %s\ndata: %s\n\n" % (self.id.encode(), self.type.encode(), orjson.dumps(self.data))
+
+def resync_event(bus):
+    return Event(bus.sequence, bus.instance, "", "resync", {"reason": "missed events; refetch"})
+
+class SubscribersExhausted(Exception):
+    pass
+
+class Subscription:
+    def __init__(self, bus, topics, queue_size: int):
+        self.bus = bus
+        self.topics = frozenset(topics)
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def deliver(self, event: Event):
+        if self.overflowed:
+            return  # the pending resync covers it
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.bus.overflows += 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(resync_event(self.bus))
+
+    async def next(self, timeout: float):
+        """The next event, or None when nothing arrived within `timeout` seconds"""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event.type == "resync":
+            self.overflowed = False
+        return event
+
+class EventBus:
+    def __init__(self, history: int = 1000, queue_size: int = 100, max_subscribers: int = 10_000):
+        # Event ids are only meaningful to the process that issued them
+        self.instance = os.urandom(4).hex()
+        self.sequence = 0
+        self.history = deque(maxlen=history)
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.topics = {}
+        self.subscriptions = 0
+        self.published = 0
+        self.overflows = 0
+
+    def publish(self, topic: str, type: str, data):
+        self.sequence += 1
+        self.published += 1
+        event = Event(self.sequence, self.instance, topic, type, data)
+        self.history.append(event)
+        for subscription in self.topics.get(topic, ()):
+            subscription.deliver(event)
+        return event
+
+    def subscribe(self, topics, last_event_id: str = None):
+        if self.subscriptions >= self.max_subscribers:
+            raise SubscribersExhausted()
+        subscription = Subscription(self, topics, self.queue_size)
+        for topic in subscription.topics:
+            self.topics.setdefault(topic, set()).add(subscription)
+        self.subscriptions += 1
+        if last_event_id:
+            self.replay(subscription, last_event_id)
+        return subscription
+
+    def replay(self, subscription: Subscription, last_event_id: str):
+        instance, _, sequence = last_event_id.rpartition("-")
+        oldest = self.history[0].sequence if self.history else self.sequence + 1
+        if instance != self.instance or not sequence.isdigit() or int(sequence) < oldest - 1:
+            subscription.deliver(resync_event(self))
+            return
+        for event in self.history:
+            if event.sequence > int(sequence) and event.topic in subscription.topics:
+                subscription.deliver(event)
+
+    def unsubscribe(self, subscription: Subscription):
+        for topic in subscription.topics:
+            listeners = self.topics.get(topic)
+            if listeners is not None:
+                listeners.discard(subscription)
+                if not listeners:
+                    del self.topics[topic]
+        self.subscriptions -= 1
+
+    def info(self):
+        return {
+            "subscriptions": self.subscriptions,
+            "topics": len(self.topics),
+            "published": self.published,
+            "overflows": self.overflows,
+            "max_subscribers": self.max_subscribers,
+        }
+
+CHANGE_STREAM_HISTORY_LOST = 286
+
+async def follow_changes(collection, pipeline, handle, retry_seconds: float = 1.0, **watch_options):
+    """Feed a collection's change stream into handle(change), resuming where it left off after errors"""
+    resume_token = None
+    while True:
+        try:
+            async with collection.watch(pipeline, resume_after=resume_token, **watch_options) as stream:
+                async for change in stream:
+                    handle(change)
+                    resume_token = stream.resume_token
+        except PyMongoError as exc:
+            if isinstance(exc, OperationFailure) and exc.code == CHANGE_STREAM_HISTORY_LOST:
+                resume_token = None  # too far behind to resume; carry on from now
+            logger.exception("Change stream on %s failed; retrying", collection.name)
+            await asyncio.sleep(retry_seconds)
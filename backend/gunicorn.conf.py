@@ -0,0 +1,70 @@
+"""
+Production server: gunicorn managing uvicorn workers
+
+    gunicorn -c gunicorn.conf.py 'server:create_app()'
+
+With preload_app the master imports server.py (FastAPI, pydantic models,
+numpy/scipy, passlib) once before forking, so workers start without
+re-importing anything and share those pages copy-on-write. Anything that
+must not cross a fork is created by each worker's lifespan instead: the
+Mongo client, Redis connections, caches, the bcrypt pool, background tasks,
+trace exporters and the event bus, whose random instance id tells a
+reconnecting client's Last-Event-ID apart from another worker's (a
+mismatch gets a resync rather than a replay from the wrong sequence).
+
+Without Redis (CATALOG_CACHE_REDIS_URL, RATE_LIMIT_REDIS_URL) and
+EVENTS_FROM_CHANGE_STREAMS the default is a single worker; WEB_CONCURRENCY
+overrides it, with a warning at startup.
+
+Restarts:
+  kill -TERM <master>   graceful shutdown; workers finish in-flight requests
+                        for up to graceful_timeout, after which open SSE
+                        streams are cut (clients reconnect with Last-Event-ID)
+  kill -HUP <master>    replaces workers with fresh ones. Under preload they
+                        fork from the already-imported code, so this picks
+                        up configuration changes, not code changes
+  kill -USR2 <master>   starts a new master on the current code next to the
+                        old one; once it is healthy, kill -WINCH then -TERM
+                        the old master for a zero-downtime deploy
+"""
+
+import multiprocessing
+import os
+
+# State that is per process unless these point every worker at a shared backend:
+# user snapshots (Redis), rate limit buckets (Redis) and event streams (change streams)
+SHARED_STATE = {
+    "CATALOG_CACHE_REDIS_URL": bool(os.environ.get("CATALOG_CACHE_REDIS_URL")),
+    "RATE_LIMIT_REDIS_URL": bool(os.environ.get("RATE_LIMIT_REDIS_URL")),
+    "EVENTS_FROM_CHANGE_STREAMS": os.environ.get("EVENTS_FROM_CHANGE_STREAMS", "false").lower() == "true",
+}
+unshared = [name for name, configured in SHARED_STATE.items() if not configured]
+
+bind = os.environ.get("BIND", "0.0.0.0:8001")
+# One worker per core only once nothing is left per process
+workers = int(os.environ.get("WEB_CONCURRENCY", "1" if unshared else str(multiprocessing.cpu_count())))
+# server.py sizes the per-worker bcrypt pools from this, and reads it at import time
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+
+preload_app = os.environ.get("PRELOAD_APP", "true").lower() == "true"
+
+# Event streams stay open; give them (and slow requests) time to wind down on restarts
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.environ.get("WORKER_TIMEOUT", "60"))
+keepalive = int(os.environ.get("KEEPALIVE_SECONDS", "5"))
+
+# Recycle workers now and then so slow leaks cannot build up; the jitter keeps them from restarting together
+max_requests = int(os.environ.get("MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", str(max_requests // 10)))
+
+accesslog = os.environ.get("ACCESS_LOG") or None
+errorlog = "-"
+
+def on_starting(server):
+    if workers > 1 and unshared:
+        server.log.warning(
+            "%d workers without %s: profiles can 404 on other workers until the user cache expires, "
+            "rate limits apply per worker, and event streams miss other workers' changes",
+            workers, ", ".join(unshared),
+        )
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+API load benchmark
+Seeds a synthetic catalog through the bulk endpoints, registers users with
+profiles, then drives concurrent catalog page, browse, search, login and
+watchlist-churn workloads and reports RPS and p50/p95/p99 per endpoint as
+JSON.
+
+By default the app runs in-process against a scratch database on the local
+mongod, so numbers cover the app and Mongo without the network. --mongomock
+swaps in an in-memory stand-in, which runs every workload but is far slower
+than a real server (useful as a smoke test, not for numbers); --url targets
+an already running server instead.
+The in-process app runs with the rate limiter off. A server under --url
+sees every simulated client as one address, so start it with
+RATE_LIMIT_ENABLED=false (or generous RATE_LIMIT_* settings); otherwise
+the search and login numbers measure 429s, which are counted as
+"throttled".
+With --budgets the run exits non-zero when any endpoint misses its budget.
+
+Seeding needs the bulk endpoints, so for a before/after comparison with a
+build that predates them, seed one database through the old build (add_sample_data.py), then run
+backend_benchmark.py against both builds, or this script with --url and
+--catalog-size 0.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+
+import httpx
+
+from search_benchmark import GENRES, generate_catalog, generate_queries, percentile
+
+WORKLOADS = ("catalog", "browse", "search", "login", "watchlist")
+PASSWORD = "bench-password"
+SEED_CHUNK = 1000
+
+class Recorder:
+    """Latency samples and error counts per endpoint label"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.throttled = Counter()
+        self.seconds = {}
+
+    async def request(self, client, method: str, url: str, label: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.latencies[label].append((time.perf_counter() - started) * 1000)
+        if response is not None and response.status_code == 429:
+            self.throttled[label] += 1
+        if response is None or response.status_code >= 400:
+            self.errors[label] += 1
+            return None
+        return response
+
+    def summary(self, label: str):
+        latencies = self.latencies[label]
+        seconds = self.seconds[label]
+        return {
+            "requests": len(latencies),
+            "errors": self.errors[label],
+            "throttled": self.throttled[label],
+            "error_rate": round(self.errors[label] / len(latencies), 4),
+            "rps": round(len(latencies) / seconds, 1) if seconds else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+        }
+
+def catalog_rows(size: int, seed: int):
+    """Full Movie/Series rows, keyed by scope, from the search benchmark generator"""
+    rows = {"movies": [], "series": []}
+    for i, (doc, content_type) in enumerate(generate_catalog(size, seed)):
+        doc.update(image_url=f"https://images.example.com/{i}.jpg", trailer_url=f"https://videos.example.com/{i}.mp4")
+        if content_type == "movie":
+            rows["movies"].append(dict(doc, duration=90 + i % 90))
+        else:
+            rows["series"].append(dict(doc, seasons=1 + i % 8, episodes=8 + i % 20))
+    return rows
+
+async def seed(client, args):
+    """Register benchmark users, each with one profile, and bulk-load the catalog"""
+    async def account(i):
+        email = f"bench-{i}@example.com"
+        response = await client.post("/api/auth/register",
+                                     json={"email": email, "password": PASSWORD, "full_name": f"Bench {i}"})
+        if response.status_code == 400:  # left over from an earlier run against --url
+            response = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        profiles = (await client.get("/api/profiles", headers=headers)).json()
+        if not profiles:
+            response = await client.post("/api/profiles", json={"name": "Bench"}, headers=headers)
+            response.raise_for_status()
+            profiles = [response.json()]
+        return {"email": email, "headers": headers, "profile_id": profiles[0]["id"]}
+
+    # One at a time: registration is bcrypt-bound and sheds load with 503s
+    users = [await account(i) for i in range(args.users)]
+
+    content_ids = []
+    if args.catalog_size:
+        started = time.perf_counter()
+        for scope, rows in catalog_rows(args.catalog_size, args.seed).items():
+            for offset in range(0, len(rows), SEED_CHUNK):
+                chunk = rows[offset:offset + SEED_CHUNK]
+                body = "\n".join(json.dumps(row) for row in chunk)
+                response = await client.post(f"/api/{scope}/bulk", content=body, headers=users[0]["headers"])
+                response.raise_for_status()
+                content_ids += [row["id"] for row in chunk]
+        print(f"📚 Seeded {len(content_ids)} titles in {time.perf_counter() - started:.1f}s")
+    else:
+        for scope in ("movies", "series"):
+            content_ids += [item["id"] for item in (await client.get(f"/api/{scope}?limit=100")).json()]
+    if not content_ids:
+        raise SystemExit("❌ No catalog to benchmark against; drop --catalog-size 0")
+    return users, content_ids
+
+async def catalog(client, recorder, rng, users, content_ids, queries):
+    scope = rng.choice(("movies", "series"))
+    await recorder.request(client, "GET", f"/api/{scope}", f"GET /api/{scope}")
+    await recorder.request(client, "GET", f"/api/{scope}", f"GET /api/{scope}?genre",
+                           params={"genre": rng.choice(GENRES)})
+
+async def browse(client, recorder, rng, users, content_ids, queries):
+    user = rng.choice(users)
+    await recorder.request(client, "GET", f"/api/browse?profile_id={user['profile_id']}", "GET /api/browse",
+                           headers=user["headers"])
+
+async def search(client, recorder, rng, users, content_ids, queries):
+    await recorder.request(client, "GET", "/api/search", "GET /api/search", params={"q": rng.choice(queries)})
+
+async def login(client, recorder, rng, users, content_ids, queries):
+    await recorder.request(client, "POST", "/api/auth/login", "POST /api/auth/login",
+                           json={"email": rng.choice(users)["email"], "password": PASSWORD})
+
+async def watchlist(client, recorder, rng, users, content_ids, queries):
+    user = rng.choice(users)
+    profile_id = user["profile_id"]
+    content_id = rng.choice(content_ids)
+    await recorder.request(client, "POST", f"/api/watchlist/{profile_id}/{content_id}",
+                           "POST /api/watchlist/{profile_id}/{content_id}", headers=user["headers"])
+    await recorder.request(client, "GET", f"/api/watchlist/{profile_id}?limit=20",
+                           "GET /api/watchlist/{profile_id}", headers=user["headers"])
+    await recorder.request(client, "DELETE", f"/api/watchlist/{profile_id}/{content_id}",
+                           "DELETE /api/watchlist/{profile_id}/{content_id}", headers=user["headers"])
+
+async def run_workload(name, client, recorder, args, users, content_ids, queries):
+    """Run one workload for --iterations rounds spread over --concurrency tasks"""
+    workload = globals()[name]
+    remaining = [args.iterations]
+    before = set(recorder.latencies)
+
+    async def worker(index):
+        rng = random.Random(args.seed * 1000 + index)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            await workload(client, recorder, rng, users, content_ids, queries)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    for label in set(recorder.latencies) - before:
+        recorder.seconds[label] = elapsed
+        summary = recorder.summary(label)
+        print(f"  {label:<48} {summary['rps']:>9} req/s  p95 {summary['p95_ms']:>8} ms  "
+              f"({summary['errors']} errors)")
+
+def check_budgets(endpoints: dict, budgets: dict):
+    """Budgets map an endpoint label (or "*") to p50_ms/p95_ms/p99_ms/max_error_rate maxima and a min_rps"""
+    violations = []
+    for label, result in endpoints.items():
+        for metric, limit in {**budgets.get("*", {}), **budgets.get(label, {})}.items():
+            if metric == "min_rps":
+                ok, value = result["rps"] >= limit, result["rps"]
+            elif metric == "max_error_rate":
+                ok, value = result["error_rate"] <= limit, result["error_rate"]
+            else:
+                ok, value = result[metric] <= limit, result[metric]
+            if not ok:
+                violations.append(f"{label} {metric}: {value} (budget {limit})")
+    return violations
+
+@asynccontextmanager
+async def app_client(args):
+    """An HTTP client for --url, or for the app served in-process with its lifespan running"""
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+            yield client
+        return
+
+    import server
+    if args.mongomock:
+        from mongomock_motor import AsyncMongoMockClient
+        server.create_mongo_client = AsyncMongoMockClient
+        server.CAUSAL_CATALOG_READS = False  # no sessions, and no secondaries to wait for
+    elif args.database == "netflix_clone":
+        raise SystemExit("❌ Refusing to benchmark against the application database")
+    else:
+        scratch = server.create_mongo_client()
+        await scratch.drop_database(args.database)
+        scratch.close()
+    server.MONGO_DB_NAME = args.database
+    # Every in-process client shares one address; budgets apply to the app, not the limiter
+    server.RATE_LIMIT_ENABLED = False
+
+    async with server.lifespan(server.app):
+        try:
+            transport = httpx.ASGITransport(app=server.app, raise_app_exceptions=False)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                yield client
+        finally:
+            if not args.mongomock and not args.keep:
+                await server.client.drop_database(args.database)
+
+async def run(args):
+    recorder = Recorder()
+    queries = generate_queries(1000, args.seed)
+    async with app_client(args) as client:
+        users, content_ids = await seed(client, args)
+        print(f"🚀 {args.iterations} rounds per workload, {args.concurrency} concurrent clients")
+        for name in args.workload or WORKLOADS:
+            await run_workload(name, client, recorder, args, users, content_ids, queries)
+
+    return {
+        "target": args.url or ("in-process (mongomock)" if args.mongomock else f"in-process ({args.database})"),
+        "catalog_size": args.catalog_size,
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "iterations": args.iterations,
+        "endpoints": {label: recorder.summary(label) for label in recorder.latencies},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--mongomock", action="store_true", help="in-process app on an in-memory Mongo stand-in")
+    parser.add_argument("--database", default="netflix_clone_bench", help="scratch database for the in-process app")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database afterwards")
+    parser.add_argument("--catalog-size", type=int, default=10_000, help="titles to seed (0: use what is there)")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=2000, help="rounds per workload")
+    parser.add_argument("--workload", action="append", choices=WORKLOADS, help="workload to run (repeatable)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--budgets", help='JSON file like {"GET /api/search": {"p95_ms": 50, "min_rps": 500}}')
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.budgets:
+        with open(args.budgets) as f:
+            results["budget_violations"] = check_budgets(results["endpoints"], json.load(f))
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    throttled = sum(endpoint["throttled"] for endpoint in results["endpoints"].values())
+    if throttled:
+        print(f"⚠️  {throttled} requests were rate limited; disable the limiter on the target (RATE_LIMIT_ENABLED=false)")
+    violations = results.get("budget_violations", [])
+    for violation in violations:
+        print(f"⚠️  {violation}")
+    if args.budgets and not violations:
+        print("✅ All endpoints within budget")
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
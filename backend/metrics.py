@@ -0,0 +1,219 @@
+"""
+Prometheus-style metrics
+
+A small in-process registry of labelled counters, gauges and histograms
+rendered in the Prometheus text exposition format, plus pymongo listeners
+that time every command and track connection pool usage. Values are per
+worker process, so scrape every worker.
+"""
+
+import math
+import threading
+
+from pymongo import monitoring
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in pairs) + "}"
+
+def format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labels)
+        self.values = {}
+        # pymongo listeners report from the driver's own threads
+        self.lock = threading.Lock()
+
+    def key(self, labels: dict):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        with self.lock:
+            values = list(self.values.items())
+        for key, value in values:
+            yield f"{self.name}{format_labels(zip(self.labelnames, key))} {format_value(value)}"
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels):
+        """Mirror a count that is kept elsewhere (e.g. cache stats)"""
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self.key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][index] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self):
+        with self.lock:
+            values = [(key, dict(state, buckets=list(state["buckets"]))) for key, state in self.values.items()]
+        for key, state in values:
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["buckets"]):
+                cumulative += count
+                yield f"{self.name}_bucket{format_labels(pairs + [('le', format_value(bound))])} {cumulative}"
+            yield f"{self.name}_bucket{format_labels(pairs + [('le', '+Inf')])} {state['count']}"
+            yield f"{self.name}_sum{format_labels(pairs)} {format_value(state['sum'])}"
+            yield f"{self.name}_count{format_labels(pairs)} {state['count']}"
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labels=()):
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels=()):
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def collector(self, func):
+        """Register a function that refreshes gauges right before each scrape"""
+        self.collectors.append(func)
+        return func
+
+    def render(self):
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+def server_address(address):
+    return f"{address[0]}:{address[1]}"
+
+class CommandMetrics(monitoring.CommandListener):
+    """Times every command the driver sends, by command name and collection"""
+
+    def __init__(self, registry: Registry):
+        self.duration = registry.histogram(
+            "mongodb_command_duration_seconds", "MongoDB command round-trip time",
+            ("command", "collection", "status"),
+        )
+        self.collections = {}
+
+    def started(self, event):
+        command = event.command
+        collection = command.get("collection") if event.command_name == "getMore" else command.get(event.command_name)
+        self.collections[(event.connection_id, event.request_id)] = collection if isinstance(collection, str) else ""
+
+    def succeeded(self, event):
+        self.finish(event, "ok")
+
+    def failed(self, event):
+        self.finish(event, "error")
+
+    def finish(self, event, status: str):
+        collection = self.collections.pop((event.connection_id, event.request_id), "")
+        self.duration.observe(event.duration_micros / 1_000_000, command=event.command_name,
+                              collection=collection, status=status)
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Open and checked-out connections per server, and checkout failures"""
+
+    def __init__(self, registry: Registry):
+        self.open = registry.gauge("mongodb_pool_connections", "Open pooled connections", ("address",))
+        self.in_use = registry.gauge("mongodb_pool_connections_in_use", "Connections checked out", ("address",))
+        self.checkout_failures = registry.counter(
+            "mongodb_pool_checkout_failures_total", "Failed connection checkouts", ("address", "reason"),
+        )
+        self.clears = registry.counter("mongodb_pool_cleared_total", "Times a pool was cleared", ("address",))
+
+    def connection_created(self, event):
+        self.open.inc(address=server_address(event.address))
+
+    def connection_closed(self, event):
+        self.open.dec(address=server_address(event.address))
+
+    def connection_checked_out(self, event):
+        self.in_use.inc(address=server_address(event.address))
+
+    def connection_checked_in(self, event):
+        self.in_use.dec(address=server_address(event.address))
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failures.inc(address=server_address(event.address), reason=event.reason)
+
+    def pool_cleared(self, event):
+        self.clears.inc(address=server_address(event.address))
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
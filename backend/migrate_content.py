@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Copy the legacy movies and series collections into the unified content
+collection, tagging each document with its content_type
+
+Idempotent: documents are upserted by id and existing content rows are
+left untouched, so it can be re-run or interrupted. The API runs it on
+startup while content is still empty. The legacy collections are kept
+so a rollback only needs the previous build.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+LEGACY_COLLECTIONS = {"movies": "movie", "series": "series"}
+
+async def migrate_catalog(db, batch_size: int = 1000):
+    copied = {}
+    for collection, content_type in LEGACY_COLLECTIONS.items():
+        ops = []
+        copied[collection] = 0
+        async for doc in db[collection].find({}, {"_id": 0}, batch_size=batch_size):
+            doc["content_type"] = content_type
+            ops.append(UpdateOne({"id": doc["id"]}, {"$setOnInsert": doc}, upsert=True))
+            if len(ops) >= batch_size:
+                await db.content.bulk_write(ops, ordered=False)
+                copied[collection] += len(ops)
+                ops = []
+        if ops:
+            await db.content.bulk_write(ops, ordered=False)
+            copied[collection] += len(ops)
+    return copied
+
+async def run(url: str, database: str, batch_size: int):
+    db = AsyncIOMotorClient(url)[database]
+    copied = await migrate_catalog(db, batch_size)
+    counts = {
+        content_type: await db.content.count_documents({"content_type": content_type})
+        for content_type in LEGACY_COLLECTIONS.values()
+    }
+    return copied, counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017/netflix_clone"))
+    parser.add_argument("--database", default=os.environ.get("MONGO_DB_NAME", "netflix_clone"))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    copied, counts = asyncio.run(run(args.url, args.database, args.batch_size))
+    for collection, content_type in LEGACY_COLLECTIONS.items():
+        print(f"  {collection}: {copied[collection]} copied, {counts[content_type]} in content")
+    print("✅ Catalog migrated to content")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
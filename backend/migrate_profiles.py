@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Move embedded users.profiles (and their watchlist arrays) into the
+profiles and watchlist_items collections
+
+Safe to run while the API is serving: every write is an idempotent upsert,
+and the API migrates any user it meets that still has embedded profiles
+(see get_user_snapshot), so the two never disagree about where a profile
+lives. Run it to completion to migrate users who are not active.
+
+Watchlist titles are looked up in content, then in the legacy movies and
+series collections, so running before the catalog migration loses nothing.
+Ids found in neither are still copied, with content_type null. The
+embedded array is only dropped once every entry has been written, and only
+if it has not changed since it was read.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from migrate_content import LEGACY_COLLECTIONS
+
+async def resolve_content_types(db, content_ids):
+    content_types = {}
+    cursor = db.content.find({"id": {"$in": list(content_ids)}}, {"_id": 0, "id": 1, "content_type": 1})
+    async for doc in cursor:
+        content_types[doc["id"]] = doc["content_type"]
+    for collection, content_type in LEGACY_COLLECTIONS.items():
+        missing = [content_id for content_id in content_ids if content_id not in content_types]
+        if not missing:
+            break
+        async for doc in db[collection].find({"id": {"$in": missing}}, {"_id": 0, "id": 1}):
+            content_types[doc["id"]] = content_type
+    return content_types
+
+async def migrate_user(db, user: dict):
+    """Copy one user's embedded profiles and watchlists out, then drop the embedded array"""
+    profiles = user.get("profiles") or []
+    watchlist_ids = {content_id for profile in profiles for content_id in profile.get("watchlist", [])}
+    content_types = await resolve_content_types(db, watchlist_ids) if watchlist_ids else {}
+
+    migrated_at = datetime.utcnow()
+    profile_ops = []
+    item_ops = []
+    for profile in profiles:
+        # Watchlist pages use added_at as their cursor, so it must never be null
+        added_at = profile.get("created_at") or migrated_at
+        profile_ops.append(UpdateOne(
+            {"id": profile["id"]},
+            {"$setOnInsert": {
+                "id": profile["id"],
+                "user_id": user["id"],
+                "name": profile["name"],
+                "avatar": profile.get("avatar", "default.png"),
+                "is_kids": profile.get("is_kids", False),
+                "created_at": added_at,
+            }},
+            upsert=True,
+        ))
+        for content_id in profile.get("watchlist", []):
+            item_ops.append(UpdateOne(
+                {"profile_id": profile["id"], "content_id": content_id},
+                {"$setOnInsert": {
+                    "profile_id": profile["id"],
+                    "content_id": content_id,
+                    "content_type": content_types.get(content_id),  # None: not in any catalog collection
+                    # Embedded arrays never recorded when an item was added
+                    "added_at": added_at,
+                }},
+                upsert=True,
+            ))
+
+    # Either write raises on any failed entry, leaving the embedded array for the next attempt
+    if profile_ops:
+        await db.profiles.bulk_write(profile_ops, ordered=False)
+    if item_ops:
+        await db.watchlist_items.bulk_write(item_ops, ordered=False)
+    await db.users.update_one({"id": user["id"], "profiles": user["profiles"]}, {"$unset": {"profiles": ""}})
+    return len(profile_ops), len(item_ops)
+
+async def migrate_all(url: str, database: str, batch_size: int):
+    db = AsyncIOMotorClient(url)[database]
+    users = profiles = items = 0
+    started = time.perf_counter()
+    cursor = db.users.find({"profiles.0": {"$exists": True}}, {"_id": 0, "id": 1, "profiles": 1},
+                           batch_size=batch_size)
+    async for user in cursor:
+        migrated_profiles, migrated_items = await migrate_user(db, user)
+        users += 1
+        profiles += migrated_profiles
+        items += migrated_items
+        if users % batch_size == 0:
+            print(f"  {users} users, {profiles} profiles, {items} watchlist items "
+                  f"({time.perf_counter() - started:.1f}s)")
+    # Rows copied by earlier runs from profiles without a created_at
+    await db.profiles.update_many({"created_at": None}, {"$currentDate": {"created_at": True}})
+    await db.watchlist_items.update_many({"added_at": None}, {"$currentDate": {"added_at": True}})
+    return users, profiles, items
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017/netflix_clone"))
+    parser.add_argument("--database", default=os.environ.get("MONGO_DB_NAME", "netflix_clone"))
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    users, profiles, items = asyncio.run(migrate_all(args.url, args.database, args.batch_size))
+    print(f"✅ Migrated {users} users, {profiles} profiles, {items} watchlist items")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,16 @@
+"""
+Password hashing
+
+Kept apart from server.py so the bcrypt worker processes only need to
+import passlib, not the whole application.
+"""
+
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def verify_password(plain_password, hashed_password):
+    return pwd_context.verify(plain_password, hashed_password)
+
+def get_password_hash(password):
+    return pwd_context.hash(password)
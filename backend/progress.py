@@ -0,0 +1,152 @@
+"""
+Playback progress with write-behind
+
+Player heartbeats are recorded in a ProgressBuffer rather than written one
+by one. The buffer keeps the latest position per (profile, title), so a
+player reporting every few seconds costs one write per flush, and flush()
+writes everything buffered as unordered bulk upserts.
+
+An upsert only matches a stored entry older than the buffered one. When
+two workers flush the same key out of order, the older write misses, runs
+into the unique (profile_id, content_id) index and is dropped: the newest
+position wins. Entries whose write failed for any other reason go back
+into the buffer unless a newer heartbeat has replaced them meanwhile.
+
+Reads merge the buffer (and a flush in progress) over what Mongo returned,
+so a profile sees its latest position straight away on the worker that
+took the heartbeat, and within one flush interval everywhere else.
+"""
+
+import asyncio
+import time
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY = 11000
+
+class ProgressBuffer:
+    def __init__(self, finished_ratio: float = 0.95, batch_size: int = 1000):
+        self.finished_ratio = finished_ratio
+        self.batch_size = batch_size
+        self.profiles = {}  # profile_id -> {content_id: (position, duration, updated_at)}
+        self.flushing = {}  # the same, for the flush being written
+        self.size = 0
+        self.full = asyncio.Event()
+        self.heartbeats = 0
+        self.coalesced = 0
+        self.written = 0
+        self.stale = 0
+        self.requeued = 0
+        self.flushes = 0
+        self.last_flush_seconds = 0.0
+
+    def __len__(self):
+        return self.size
+
+    def is_finished(self, position: float, duration: float):
+        return position >= duration * self.finished_ratio
+
+    def record(self, profile_id: str, content_id: str, position: float, duration: float, updated_at):
+        self.heartbeats += 1
+        entries = self.profiles.get(profile_id)
+        if entries is None:
+            entries = self.profiles[profile_id] = {}
+        if content_id in entries:
+            self.coalesced += 1
+        else:
+            self.size += 1
+            if self.size >= self.batch_size:
+                self.full.set()
+        entries[content_id] = (position, duration, updated_at)
+
+    def restore(self, profile_id: str, content_id: str, entry):
+        """Put back an entry that could not be written, unless a newer one arrived since"""
+        entries = self.profiles.setdefault(profile_id, {})
+        if content_id not in entries:
+            entries[content_id] = entry
+            self.size += 1
+            self.requeued += 1
+
+    def pending(self, profile_id: str):
+        """Buffered entries for one profile, the newest for each title"""
+        return {**self.flushing.get(profile_id, {}), **self.profiles.get(profile_id, {})}
+
+    async def flush(self, collection):
+        """Write out everything buffered; returns the number of entries written"""
+        self.full.clear()
+        if not self.size:
+            return 0
+        self.flushing, self.profiles, self.size = self.profiles, {}, 0
+        started = time.perf_counter()
+        keys = []
+        ops = []
+        for profile_id, entries in self.flushing.items():
+            for content_id, (position, duration, updated_at) in entries.items():
+                keys.append((profile_id, content_id))
+                ops.append(UpdateOne(
+                    {"profile_id": profile_id, "content_id": content_id, "updated_at": {"$lt": updated_at}},
+                    {"$set": {
+                        "position": position,
+                        "duration": duration,
+                        "finished": self.is_finished(position, duration),
+                        "updated_at": updated_at,
+                    }},
+                    upsert=True,
+                ))
+        written = 0
+        try:
+            for start in range(0, len(ops), self.batch_size):
+                batch = ops[start:start + self.batch_size]
+                try:
+                    await collection.bulk_write(batch, ordered=False)
+                    written += len(batch)
+                except BulkWriteError as exc:
+                    failed = 0
+                    for error in exc.details.get("writeErrors", []):
+                        if error["code"] == DUPLICATE_KEY:
+                            self.stale += 1  # a newer position is already stored
+                        else:
+                            profile_id, content_id = keys[start + error["index"]]
+                            self.restore(profile_id, content_id, self.flushing[profile_id][content_id])
+                        failed += 1
+                    written += len(batch) - failed
+                except BaseException:  # cancellation too: the batch may not have been written
+                    for profile_id, content_id in keys[start:]:
+                        self.restore(profile_id, content_id, self.flushing[profile_id][content_id])
+                    raise
+        finally:
+            self.flushing = {}
+            self.written += written
+            self.flushes += 1
+            self.last_flush_seconds = time.perf_counter() - started
+        return written
+
+    def merge(self, profile_id: str, stored, limit: int):
+        """Unfinished titles, most recent first, from stored documents with buffered entries applied"""
+        items = {doc["content_id"]: doc for doc in stored}
+        for content_id, (position, duration, updated_at) in self.pending(profile_id).items():
+            current = items.get(content_id)
+            if current is None or current["updated_at"] <= updated_at:
+                items[content_id] = {
+                    "content_id": content_id,
+                    "position": position,
+                    "duration": duration,
+                    "finished": self.is_finished(position, duration),
+                    "updated_at": updated_at,
+                }
+        unfinished = [item for item in items.values() if not item["finished"]]
+        unfinished.sort(key=lambda item: item["updated_at"], reverse=True)
+        return unfinished[:limit]
+
+    def info(self):
+        return {
+            "buffered": self.size,
+            "heartbeats": self.heartbeats,
+            "coalesced": self.coalesced,
+            "written": self.written,
+            "stale": self.stale,
+            "requeued": self.requeued,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_seconds * 1000, 2),
+        }
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Playback progress ingestion benchmark
+Drives the write-behind pipeline (progress.py) at a target heartbeat rate:
+--players simulated players each report every --interval seconds, paced so
+the whole fleet produces --rate heartbeats per second, while a flush loop
+writes the buffer to Mongo the way the server does. Reports the rate
+actually sustained, CPU per heartbeat, Mongo writes per heartbeat, flush
+latency and peak buffer size, next to the cost of the naive approach (one
+update_one per heartbeat) measured on a sample.
+
+This measures the ingestion path inside one worker, without HTTP; split
+--rate across WEB_CONCURRENCY workers for a fleet-wide figure. By default
+it writes to a scratch database on the local mongod; --mongomock swaps in
+an in-memory stand-in (its bulk writes are far slower than a real server's).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime
+
+from pymongo import ASCENDING, IndexModel
+
+from progress import ProgressBuffer
+from search_benchmark import percentile
+
+async def flush_loop(buffer, collection, flush_seconds, stop, durations, peaks):
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(buffer.full.wait(), flush_seconds)
+        except asyncio.TimeoutError:
+            pass
+        peaks.append(len(buffer))
+        started = time.perf_counter()
+        await buffer.flush(collection)
+        durations.append((time.perf_counter() - started) * 1000)
+
+async def produce(buffer, args, titles):
+    """Heartbeats in 10ms ticks; returns (heartbeats sent, CPU seconds spent recording)"""
+    rng = random.Random(args.seed)
+    positions = [0.0] * args.players
+    watching = [rng.choice(titles) for _ in range(args.players)]
+    per_tick = args.rate / 100
+    sent = 0
+    cpu = 0.0
+    started = time.perf_counter()
+    player = 0
+    while time.perf_counter() - started < args.seconds:
+        due = int((time.perf_counter() - started) * 100 * per_tick) - sent
+        tick_started = time.process_time()
+        now = datetime.utcnow()
+        for _ in range(max(0, due)):
+            positions[player] += args.interval
+            if positions[player] >= args.title_seconds:
+                positions[player] = 0.0
+                watching[player] = rng.choice(titles)
+            buffer.record(f"profile-{player}", watching[player], positions[player], args.title_seconds, now)
+            player = (player + 1) % args.players
+            sent += 1
+        cpu += time.process_time() - tick_started
+        await asyncio.sleep(0.01)
+    return sent, cpu, time.perf_counter() - started
+
+async def naive_sample(collection, count, titles):
+    started = time.perf_counter()
+    for n in range(count):
+        await collection.update_one(
+            {"profile_id": f"naive-{n}", "content_id": titles[n % len(titles)]},
+            {"$set": {"position": float(n), "duration": 3600.0, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    return (time.perf_counter() - started) / count
+
+async def run(args):
+    if args.mongomock:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        if args.database == "netflix_clone":
+            raise SystemExit("❌ Refusing to benchmark against the application database")
+        client = AsyncIOMotorClient(args.url)
+        await client.drop_database(args.database)
+    collection = client[args.database].playback_progress
+    await collection.create_indexes([
+        IndexModel([("profile_id", ASCENDING), ("content_id", ASCENDING)], name="profile_content_unique", unique=True)
+    ])
+
+    titles = [f"title-{n}" for n in range(args.titles)]
+    buffer = ProgressBuffer(batch_size=args.batch_size)
+    stop = asyncio.Event()
+    durations, peaks = [], []
+    flusher = asyncio.create_task(flush_loop(buffer, collection, args.flush_seconds, stop, durations, peaks))
+    sent, cpu, elapsed = await produce(buffer, args, titles)
+    stop.set()
+    await flusher
+    drain_started = time.perf_counter()
+    await buffer.flush(collection)
+    drain_ms = (time.perf_counter() - drain_started) * 1000
+    naive = await naive_sample(collection.database.naive_progress, args.naive_sample, titles)
+    if not args.mongomock:
+        await client.drop_database(args.database)
+    client.close()
+
+    info = buffer.info()
+    return {
+        "target": "mongomock" if args.mongomock else args.database,
+        "target_rate": args.rate,
+        "sustained_rate": round(sent / elapsed),
+        "heartbeats": sent,
+        "record_cpu_us": round(cpu / max(sent, 1) * 1e6, 3),
+        "writes": info["written"],
+        "writes_per_heartbeat": round(info["written"] / max(sent, 1), 4),
+        "flushes": info["flushes"],
+        "flush_ms": {"p50": round(percentile(durations, 50), 1), "p95": round(percentile(durations, 95), 1),
+                     "max": round(max(durations, default=0.0), 1)},
+        "peak_buffered": max(peaks, default=0),
+        "drain_ms": round(drain_ms, 1),
+        "naive_update_one_ms": round(naive * 1000, 3),
+        "naive_max_rate": round(1 / naive) if naive else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="mongodb://localhost:27017")
+    parser.add_argument("--mongomock", action="store_true")
+    parser.add_argument("--database", default="netflix_clone_bench")
+    parser.add_argument("--rate", type=int, default=50_000, help="heartbeats per second")
+    parser.add_argument("--players", type=int, default=500_000)
+    parser.add_argument("--interval", type=float, default=10.0, help="seconds between a player's heartbeats")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--titles", type=int, default=10_000)
+    parser.add_argument("--title-seconds", type=float, default=3600.0)
+    parser.add_argument("--flush-seconds", type=float, default=5.0)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--naive-sample", type=int, default=2000, help="update_one calls to time for comparison")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    # Falling behind shows up as a lower sustained rate and a buffer that keeps growing
+    if results["sustained_rate"] < args.rate * 0.95:
+        print(f"⚠️  Sustained {results['sustained_rate']}/s, below the {args.rate}/s target")
+        return 1
+    print(f"✅ Sustained {results['sustained_rate']}/s with {results['writes_per_heartbeat']} writes per heartbeat")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
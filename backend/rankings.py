@@ -0,0 +1,116 @@
+"""
+Materialized ranking lists
+
+The rankings collection holds one document per (kind, content_type, genre)
+with the best RANKING_SIZE cards of that slice, best first: top_rated by
+rating, newest by created_at and most_watchlisted by watchlist_count. "*"
+stands for every content type or every genre.
+
+New titles and watchlist changes are pushed into the lists they belong to
+with $push/$sort/$slice, so serving a list never sorts the catalog.
+rebuild_rankings() recomputes everything from indexed per-genre queries to
+reconcile whatever the incremental path misses (e.g. a title dropping out
+of a most-watchlisted list).
+"""
+
+from collections import defaultdict
+from datetime import datetime
+
+from pymongo import ReplaceOne, UpdateOne
+
+RANKING_KINDS = {
+    "top_rated": "rating",
+    "newest": "created_at",
+    "most_watchlisted": "watchlist_count",
+}
+
+def ranking_id(kind: str, content_type: str = "*", genre: str = "*"):
+    return f"{kind}:{content_type}:{genre}"
+
+def ranking_projection(card_fields):
+    return {"_id": 0, **{field: 1 for field in card_fields}, "created_at": 1, "watchlist_count": 1}
+
+def ranking_item(doc: dict, kind: str, card_fields):
+    """A card plus the field its list is ordered by"""
+    item = {field: doc[field] for field in card_fields if field in doc}
+    field = RANKING_KINDS[kind]
+    item[field] = doc.get(field, 0 if field == "watchlist_count" else None)
+    return item
+
+def top_items(items, kind: str, size: int):
+    """Best `size` items of a merged list, one per id"""
+    field = RANKING_KINDS[kind]
+    ordered = sorted(items, key=lambda item: (item[field] is not None, item[field] or 0, item["id"]), reverse=True)
+    seen = set()
+    top = []
+    for item in ordered:
+        if item["id"] not in seen:
+            seen.add(item["id"])
+            top.append(item)
+            if len(top) == size:
+                break
+    return top
+
+async def push_to_rankings(db, docs, kinds, card_fields, size: int):
+    """Move each doc into every list it belongs to, replacing any stale copy"""
+    grouped = defaultdict(list)
+    for doc in docs:
+        for kind in kinds:
+            for content_type in (doc["content_type"], "*"):
+                for genre in (doc["genre"], "*"):
+                    grouped[(kind, content_type, genre)].append(ranking_item(doc, kind, card_fields))
+
+    now = datetime.utcnow()
+    ops = []
+    for (kind, content_type, genre), items in grouped.items():
+        _id = ranking_id(kind, content_type, genre)
+        ops.append(UpdateOne({"_id": _id}, {"$pull": {"items": {"id": {"$in": [item["id"] for item in items]}}}}))
+        ops.append(UpdateOne(
+            {"_id": _id},
+            {
+                "$push": {"items": {"$each": items, "$sort": {RANKING_KINDS[kind]: -1, "id": -1}, "$slice": size}},
+                "$set": {"kind": kind, "content_type": content_type, "genre": genre, "updated_at": now},
+            },
+            upsert=True,
+        ))
+    if ops:
+        # Ordered, so each list's $pull lands before its $push
+        await db.rankings.bulk_write(ops, ordered=True)
+
+async def rebuild_rankings(db, content_types, card_fields, size: int):
+    """Recompute every list; returns how many were written"""
+    projection = ranking_projection(card_fields)
+    lists = {}
+    for content_type in content_types:
+        for genre in await db.content.distinct("genre", {"content_type": content_type}):
+            for kind, field in RANKING_KINDS.items():
+                docs = await db.content.find({"content_type": content_type, "genre": genre}, projection).sort(
+                    [(field, -1), ("_id", -1)]
+                ).limit(size).to_list(length=size)
+                lists[(kind, content_type, genre)] = top_items(
+                    [ranking_item(doc, kind, card_fields) for doc in docs], kind, size
+                )
+
+    # The top N of a union lies within the union of each part's top N
+    merged = defaultdict(list)
+    for (kind, content_type, genre), items in lists.items():
+        for wider in ((kind, content_type, "*"), (kind, "*", genre), (kind, "*", "*")):
+            merged[wider].extend(items)
+    for key, items in merged.items():
+        lists[key] = top_items(items, key[0], size)
+
+    now = datetime.utcnow()
+    ids = []
+    ops = []
+    for (kind, content_type, genre), items in lists.items():
+        ids.append(ranking_id(kind, content_type, genre))
+        ops.append(ReplaceOne(
+            {"_id": ids[-1]},
+            {"kind": kind, "content_type": content_type, "genre": genre, "items": items, "updated_at": now},
+            upsert=True,
+        ))
+    if ops:
+        await db.rankings.bulk_write(ops, ordered=False)
+    # Genres that no longer have any titles
+    await db.rankings.delete_many({"_id": {"$nin": ids}})
+    return len(ops)
@@ -0,0 +1,90 @@
+"""
+Token-bucket rate limiter backends
+
+Each client key (per IP or per user) owns a bucket of `capacity` tokens
+that refills at `refill_rate` tokens per second; a request takes as many
+tokens as its route costs. MemoryBuckets keeps buckets in the worker
+process. RedisBuckets keeps them in any Redis-compatible server, updated
+atomically by a Lua script against the server clock, so every worker
+shares one budget per client. Both answer take() with 0 when the request
+may proceed, otherwise the seconds until it could.
+"""
+
+import time
+from collections import OrderedDict
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional shared backend
+    redis = None
+
+class MemoryBuckets:
+    backend = "memory"
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+
+    async def take(self, key: str, cost: float, capacity: float, refill_rate: float) -> float:
+        now = time.monotonic()
+        tokens, updated = self.buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+        cost = min(cost, capacity)
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / refill_rate
+        self.buckets[key] = (tokens, now)
+        self.buckets.move_to_end(key)
+        # Dropping the stalest bucket only ever hands that client a full one
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return retry_after
+
+    def info(self):
+        return {"backend": self.backend, "buckets": len(self.buckets), "max_keys": self.max_keys}
+
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = math.min(tonumber(ARGV[3]), capacity)
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(retry_after)
+"""
+
+class RedisBuckets:
+    """Shared buckets; idle ones expire once they would have refilled anyway"""
+
+    backend = "redis"
+
+    def __init__(self, client, namespace: str = "ratelimit:"):
+        self.client = client
+        self.namespace = namespace
+        self.script = client.register_script(TAKE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the redis package is not installed")
+        return cls(redis.from_url(url), **kwargs)
+
+    async def take(self, key: str, cost: float, capacity: float, refill_rate: float) -> float:
+        retry_after = await self.script(keys=[self.namespace + key], args=[capacity, refill_rate, cost])
+        return float(retry_after)
+
+    def info(self):
+        return {"backend": self.backend}
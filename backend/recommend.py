@@ -0,0 +1,115 @@
+"""
+Watchlist co-occurrence recommendations
+
+Recommender.build() turns (profile, title) watchlist pairs into a sparse
+profile x title matrix X and derives the item-item similarity X^T X,
+cosine-normalised by how often each title is watchlisted and pruned to
+each title's strongest neighbours. Scoring a profile is then one sparse
+row sum over the titles on its watchlist, plus a genre-affinity term and a
+popularity prior so that titles (and profiles) without co-occurrences
+still rank sensibly. Everything is vectorised over the whole catalog;
+builds are meant to run off the event loop.
+"""
+
+import numpy as np
+from scipy import sparse
+
+# Relative weight of each scoring term; co-occurrence similarities are in [0, 1]
+GENRE_WEIGHT = 0.05
+POPULARITY_WEIGHT = 0.01
+
+class Recommender:
+    def __init__(self, ids, similarity, genres, popularity, kids):
+        self.ids = ids
+        self.index = {content_id: i for i, content_id in enumerate(ids)}
+        self.similarity = similarity  # CSR, titles x titles
+        self.genres = genres          # CSR one-hot, titles x genres
+        self.popularity = popularity  # watchlist count scaled to [0, 1]
+        self.kids = kids              # bool mask of kids-safe titles
+        self.pairs = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def empty(cls):
+        return cls([], sparse.csr_matrix((0, 0), dtype=np.float32), sparse.csr_matrix((0, 0), dtype=np.float32),
+                   np.zeros(0, dtype=np.float32), np.zeros(0, dtype=bool))
+
+    @classmethod
+    def build(cls, catalog, pairs, kids_genres, neighbours: int = 50):
+        """catalog: (content_id, genre) per title; pairs: (profile_id, content_id) per watchlist entry"""
+        ids = [content_id for content_id, _ in catalog]
+        index = {content_id: i for i, content_id in enumerate(ids)}
+        genre_names = sorted({genre for _, genre in catalog})
+        genre_index = {genre: i for i, genre in enumerate(genre_names)}
+        genre_cols = np.fromiter((genre_index[genre] for _, genre in catalog), dtype=np.int32, count=len(ids))
+        genres = sparse.csr_matrix(
+            (np.ones(len(ids), dtype=np.float32), (np.arange(len(ids)), genre_cols)),
+            shape=(len(ids), len(genre_names)),
+        )
+        kids = np.isin(genre_cols, [genre_index[genre] for genre in kids_genres if genre in genre_index])
+
+        profiles = {}
+        rows, cols = [], []
+        for profile_id, content_id in pairs:
+            col = index.get(content_id)
+            if col is not None:
+                rows.append(profiles.setdefault(profile_id, len(profiles)))
+                cols.append(col)
+        watchlists = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(profiles), len(ids)),
+        )
+        watchlists.data[:] = 1  # duplicate pairs count once
+
+        counts = np.asarray(watchlists.sum(axis=0)).ravel()
+        scale = sparse.diags(np.divide(1, np.sqrt(counts), out=np.zeros_like(counts), where=counts > 0))
+        similarity = (scale @ (watchlists.T @ watchlists) @ scale).tocsr()
+        similarity.setdiag(0)
+        similarity.eliminate_zeros()
+        similarity = prune_rows(similarity, neighbours)
+
+        recommender = cls(ids, similarity, genres, counts / counts.max() if counts.any() else counts, kids)
+        recommender.pairs = len(rows)
+        return recommender
+
+    def recommend(self, watched, limit: int = 20, kids: bool = False):
+        """Content ids ranked for a profile whose watchlist holds `watched`"""
+        if not self.ids:
+            return []
+        seeds = np.fromiter((self.index[content_id] for content_id in watched if content_id in self.index),
+                            dtype=np.int64)
+        scores = POPULARITY_WEIGHT * self.popularity
+        if len(seeds):
+            scores = scores + np.asarray(self.similarity[seeds].sum(axis=0)).ravel()
+            affinity = np.asarray(self.genres[seeds].sum(axis=0)).ravel() / len(seeds)
+            scores = scores + GENRE_WEIGHT * (self.genres @ affinity)
+            scores[seeds] = -np.inf
+        if kids:
+            scores = np.where(self.kids, scores, -np.inf)
+
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [self.ids[i] for i in top if np.isfinite(scores[i])]
+
+    def info(self):
+        return {
+            "titles": len(self.ids),
+            "watchlist_pairs": self.pairs,
+            "similarities": int(self.similarity.nnz),
+        }
+
+def prune_rows(matrix, keep: int):
+    """Keep the `keep` largest entries of each CSR row"""
+    lengths = np.diff(matrix.indptr)
+    if not len(lengths) or lengths.max() <= keep:
+        return matrix
+    data = matrix.data.copy()
+    for row in np.flatnonzero(lengths > keep):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        weakest = np.argpartition(data[start:end], end - start - keep)[:end - start - keep]
+        data[start + weakest] = 0
+    pruned = sparse.csr_matrix((data, matrix.indices, matrix.indptr), shape=matrix.shape)
+    pruned.eliminate_zeros()
+    return pruned
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Recommendation benchmark
+Builds a Recommender over N generated titles and synthetic watchlists
+(each profile favours a couple of genres and popular titles) and reports
+build time and per-profile scoring latency percentiles.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from recommend import Recommender
+from search_benchmark import GENRES, generate_catalog, percentile
+
+KIDS_GENRES = ["Animation"]
+
+def generate_watchlists(catalog, profiles: int, watchlist_size: int, seed: int = 42):
+    """(profile_id, content_id) pairs, skewed towards each profile's genres and a popular head"""
+    rng = random.Random(seed)
+    by_genre = {genre: [] for genre in GENRES}
+    for content_id, genre in catalog:
+        by_genre[genre].append(content_id)
+    watchlists = {}
+    for p in range(profiles):
+        favourites = rng.sample(GENRES, 2)
+        picks = set()
+        while len(picks) < watchlist_size:
+            titles = by_genre[rng.choice(favourites)] if rng.random() < 0.8 else [rng.choice(catalog)[0]]
+            # Pareto-ish: low positions (the "popular" titles) come up far more often
+            picks.add(titles[min(len(titles) - 1, int(rng.paretovariate(1.2)) - 1)])
+        watchlists[f"profile-{p}"] = list(picks)
+    return watchlists
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000, help="number of titles")
+    parser.add_argument("--profiles", type=int, default=50_000)
+    parser.add_argument("--watchlist-size", type=int, default=30)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--neighbours", type=int, default=50)
+    parser.add_argument("--budget-ms", type=float, default=20.0, help="p95 latency budget")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    catalog = [(doc["id"], doc["genre"]) for doc, _ in generate_catalog(args.size)]
+    watchlists = generate_watchlists(catalog, args.profiles, args.watchlist_size)
+    pairs = [(profile_id, content_id) for profile_id, ids in watchlists.items() for content_id in ids]
+
+    started = time.perf_counter()
+    recommender = Recommender.build(catalog, pairs, KIDS_GENRES, args.neighbours)
+    build_seconds = time.perf_counter() - started
+    print(f"📚 Built recommendations for {len(recommender)} titles from {len(pairs)} watchlist entries "
+          f"in {build_seconds:.2f}s ({recommender.similarity.nnz} similarities)")
+
+    rng = random.Random(7)
+    profiles = list(watchlists)
+    latencies = []
+    for i in range(args.queries):
+        watched = watchlists[rng.choice(profiles)]
+        started = time.perf_counter()
+        recommender.recommend(watched, limit=args.limit, kids=i % 10 == 0)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    results = {
+        "titles": len(recommender),
+        "profiles": args.profiles,
+        "watchlist_pairs": len(pairs),
+        "similarities": int(recommender.similarity.nnz),
+        "similarity_mb": round((recommender.similarity.data.nbytes + recommender.similarity.indices.nbytes
+                                + recommender.similarity.indptr.nbytes) / 2**20, 1),
+        "numpy": np.__version__,
+        "build_seconds": round(build_seconds, 3),
+        "queries": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    within_budget = results["p95_ms"] <= args.budget_ms
+    print("✅ p95 within budget" if within_budget else f"⚠️  p95 over {args.budget_ms} ms budget")
+    return 0 if within_budget else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+In-process full-text search over the movie and series catalog
+
+An inverted index with a light Porter-style stemmer and BM25 ranking.
+Title, genre and description are indexed with different weights, and the
+last query token doubles as a prefix so the same index serves typeahead.
+
+Each term keeps an impact-ordered list of its BM25 contributions so a
+query only walks the head of each list instead of every posting. Lists are
+built by warm() (or lazily on first use) and new documents are inserted in
+place; idf/avgdl drift from later inserts is corrected by the next warm().
+"""
+
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or the to with".split()
+)
+
+FIELD_WEIGHTS = {"title": 3.0, "genre": 2.0, "description": 1.0}
+
+VOWELS = frozenset("aeiou")
+
+def _has_vowel(token):
+    return any(ch in VOWELS for ch in token)
+
+def stem(token):
+    """Cheap suffix stripping, close enough to Porter step 1 for catalog text"""
+    if len(token) <= 3:
+        return token
+
+    if token.endswith("sses"):
+        token = token[:-2]
+    elif token.endswith("ies"):
+        token = token[:-2]
+    elif token.endswith("s") and not token.endswith("ss") and not token.endswith("us"):
+        token = token[:-1]
+
+    if token.endswith("eed"):
+        token = token[:-1]
+    else:
+        for suffix in ("ing", "ed"):
+            if token.endswith(suffix) and _has_vowel(token[:-len(suffix)]):
+                token = token[:-len(suffix)]
+                if len(token) > 2 and token[-1] == token[-2] and token[-1] not in "lsz":
+                    token = token[:-1]
+                break
+
+    if token.endswith("y") and len(token) > 2 and _has_vowel(token[:-1]):
+        token = token[:-1] + "i"
+    if token.endswith("e") and len(token) > 4:
+        token = token[:-1]
+    return token
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+class SearchIndex:
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_prefix_terms: int = 20,
+                 candidate_depth: int = 1000):
+        self.k1 = k1
+        self.b = b
+        self.max_prefix_terms = max_prefix_terms
+        self.candidate_depth = candidate_depth
+        self.postings = {}
+        self.docs = {}
+        self.doc_terms = {}
+        self.doc_lengths = {}
+        self.total_length = 0.0
+        self._impacts = {}
+        self._sorted_terms = []
+        self._terms_dirty = False
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc: dict, content_type: str):
+        doc_id = doc["id"]
+        if doc_id in self.docs:
+            self.remove(doc_id)
+
+        terms = {}
+        length = 0.0
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(str(doc.get(field, ""))):
+                term = stem(token)
+                terms[term] = terms.get(term, 0.0) + weight
+                length += weight
+
+        for term, tf in terms.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                self._terms_dirty = True
+            postings[doc_id] = tf
+
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+        for term, tf in terms.items():
+            impacts = self._impacts.get(term)
+            if impacts is not None:
+                insort(impacts, (-self._impact(term, doc_id, tf), doc_id))
+
+        stored = dict(doc)
+        if "_id" in stored:
+            stored["_id"] = str(stored["_id"])
+        stored["content_type"] = content_type
+        self.docs[doc_id] = stored
+        self.doc_terms[doc_id] = terms
+
+    def add_many(self, docs, content_type: str):
+        """Add a batch of documents; impact lists are rebuilt lazily on the next query"""
+        self._impacts = {}
+        for doc in docs:
+            self.add(doc, content_type)
+
+    def remove(self, doc_id: str):
+        if doc_id not in self.docs:
+            return
+        for term in self.doc_terms.pop(doc_id):
+            postings = self.postings[term]
+            postings.pop(doc_id, None)
+            self._impacts.pop(term, None)
+            if not postings:
+                del self.postings[term]
+                self._terms_dirty = True
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        del self.docs[doc_id]
+
+    def clear(self):
+        self.__init__(self.k1, self.b, self.max_prefix_terms, self.candidate_depth)
+
+    def _expand_prefix(self, prefix):
+        if self._terms_dirty:
+            self._sorted_terms = sorted(self.postings)
+            self._terms_dirty = False
+        terms = self._sorted_terms
+        start = bisect_left(terms, prefix)
+        matches = []
+        for term in terms[start:start + self.max_prefix_terms]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def _query_terms(self, query, prefix):
+        tokens = tokenize(query)
+        weighted = {}
+        for token in tokens:
+            weighted[stem(token)] = 1.0
+        if prefix and tokens and len(tokens[-1]) >= 2 and not query[-1:].isspace():
+            # Partially typed word: match any indexed term it is a prefix of
+            for term in self._expand_prefix(tokens[-1]):
+                weighted.setdefault(term, 0.5)
+        return weighted
+
+    def _impact(self, term, doc_id, tf):
+        n_docs = max(len(self.doc_lengths), 1)
+        avg_length = self.total_length / n_docs or 1.0
+        df = len(self.postings[term])
+        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        norm = tf + self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+        return idf * tf * (self.k1 + 1) / norm
+
+    def _impact_list(self, term):
+        impacts = self._impacts.get(term)
+        if impacts is None:
+            # Stored as (-impact, doc_id) so insort keeps the best first
+            impacts = sorted(
+                (-self._impact(term, doc_id, tf), doc_id)
+                for doc_id, tf in self.postings[term].items()
+            )
+            self._impacts[term] = impacts
+        return impacts
+
+    def warm(self):
+        """Rebuild every impact list against the current corpus statistics"""
+        self._impacts = {}
+        for term in self.postings:
+            self._impact_list(term)
+
+    def score(self, query: str, content_type: str = None, prefix: bool = True, depth: int = None):
+        if not self.docs:
+            return {}
+        depth = depth or self.candidate_depth
+        docs = self.docs
+
+        scores = {}
+        for term, boost in self._query_terms(query, prefix).items():
+            if term not in self.postings:
+                continue
+            taken = 0
+            # Prefix expansions share one term's budget between them
+            term_depth = depth if boost == 1.0 else max(1, depth // self.max_prefix_terms)
+            for negative_impact, doc_id in self._impact_list(term):
+                if content_type and docs[doc_id]["content_type"] != content_type:
+                    continue
+                scores[doc_id] = scores.get(doc_id, 0.0) - negative_impact * boost
+                taken += 1
+                if taken >= term_depth:
+                    break
+        return scores
+
+    def ranked(self, query: str, content_type: str = None, limit: int = 20, offset: int = 0,
+               prefix: bool = True, after: tuple = None, depth: int = None):
+        """
+        Return [(rank_key, doc)] best first, where rank_key is (score, rating, id).
+        Passing the last rank_key seen as `after` continues from that point.
+        """
+        depth = depth or max(self.candidate_depth, 10 * (offset + limit))
+        scores = self.score(query, content_type, prefix, depth=depth)
+        docs = self.docs
+        keys = ((score, docs[doc_id].get("rating", 0), doc_id) for doc_id, score in scores.items())
+        if after is not None:
+            after = tuple(after)
+            keys = (key for key in keys if key < after)
+        top = heapq.nlargest(offset + limit, keys)
+        return [(key, docs[key[2]]) for key in top[offset:]]
+
+    def search(self, query: str, content_type: str = None, limit: int = 20, offset: int = 0,
+               prefix: bool = True):
+        return [doc for _, doc in self.ranked(query, content_type, limit, offset, prefix)]
+
+    def suggest(self, query: str, content_type: str = None, limit: int = 10):
+        return [
+            {"id": doc["id"], "title": doc["title"], "content_type": doc["content_type"]}
+            for doc in self.search(query, content_type, limit=limit)
+        ]
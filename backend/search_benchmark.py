@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Search benchmark with a synthetic catalog generator
+Builds a SearchIndex over N generated titles and reports query latency
+percentiles for full-word and typeahead (prefix) queries.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from uuid import uuid4
+
+from search import SearchIndex
+
+GENRES = ["Action", "Comedy", "Drama", "Horror", "Sci-Fi", "Crime", "Romance", "Thriller",
+          "Documentary", "Animation", "Fantasy", "Mystery"]
+
+WORDS = """
+night dark knight shadow empire city river storm fire ice star galaxy planet dream dreams
+secret secrets lost last first return rising fall falling king queen kingdom war wars love
+hunter hunters ghost ghosts island ocean mountain desert road journey escape legend legends
+machine robot future past time traveler travelers winter summer blood silver golden iron
+broken hidden silent wild wolf wolves dragon dragons heart hearts storm city mission
+detective crime family brother sister father mother son daughter friend friends stranger
+""".split()
+
+def generate_catalog(size: int, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(size):
+        title = " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 4)))
+        description = " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 30)))
+        yield {
+            "id": str(uuid4()),
+            "title": f"{title} {i}",
+            "description": description,
+            "genre": rng.choice(GENRES),
+            "year": rng.randint(1950, 2024),
+            "rating": round(rng.uniform(1, 5), 1),
+        }, "movie" if i % 3 else "series"
+
+def generate_queries(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.5:
+            # Typeahead: last word partially typed
+            words[-1] = words[-1][:rng.randint(2, len(words[-1]))]
+        queries.append(" ".join(words))
+    return queries
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000, help="number of titles")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=10.0, help="p95 latency budget")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    index = SearchIndex()
+    started = time.perf_counter()
+    for doc, content_type in generate_catalog(args.size):
+        index.add(doc, content_type)
+    index.warm()
+    build_seconds = time.perf_counter() - started
+    print(f"📚 Indexed {len(index)} titles in {build_seconds:.2f}s ({len(index.postings)} terms)")
+
+    latencies = []
+    for query in generate_queries(args.queries):
+        started = time.perf_counter()
+        index.search(query, limit=args.limit)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    results = {
+        "titles": len(index),
+        "terms": len(index.postings),
+        "build_seconds": round(build_seconds, 3),
+        "queries": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    within_budget = results["p95_ms"] <= args.budget_ms
+    print("✅ p95 within budget" if within_budget else f"⚠️  p95 over {args.budget_ms} ms budget")
+    return 0 if within_budget else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
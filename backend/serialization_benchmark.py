@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for list endpoints
+Compares the old path (whole documents, str(_id) loop, jsonable_encoder,
+stdlib JSON) with the new one (card projection serialized by orjson) on
+pages of synthetic catalog documents, reporting bytes and CPU per response.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import orjson
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from server import PROJECTIONS
+
+def generate_page(size: int, seed: int = 42):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "id": f"movie-{i:06d}",
+            "title": f"Synthetic Title {i}",
+            "description": " ".join(rng.choice(["a", "dark", "epic", "story", "of", "love", "and", "loss"])
+                                    for _ in range(40)),
+            "genre": rng.choice(["Action", "Drama", "Comedy", "Sci-Fi"]),
+            "year": rng.randint(1950, 2024),
+            "rating": round(rng.uniform(1, 5), 1),
+            "image_url": f"https://images.example.com/{i}.jpg",
+            "trailer_url": f"https://videos.example.com/{i}.mp4",
+            "duration": rng.randint(80, 180),
+            "created_at": now - timedelta(days=i),
+        }
+        for i in range(size)
+    ]
+
+def apply_projection(doc, projection):
+    # What Mongo would hand back for this projection
+    return {field: value for field, value in doc.items() if projection.get(field)}
+
+def serialize_legacy(page):
+    docs = [dict(doc) for doc in page]
+    for doc in docs:
+        doc["_id"] = str(doc["_id"])
+    return json.dumps(jsonable_encoder(docs)).encode()
+
+def serialize_lean(page):
+    return orjson.dumps(page)
+
+def measure(func, page, rounds):
+    started = time.process_time()
+    for _ in range(rounds):
+        body = func(page)
+    return (time.process_time() - started) / rounds * 1000, len(body)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1000, help="items per page")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    page = generate_page(args.size)
+    card_page = [apply_projection(doc, PROJECTIONS["card"]) for doc in page]
+
+    legacy_ms, legacy_bytes = measure(serialize_legacy, page, args.rounds)
+    lean_ms, lean_bytes = measure(serialize_lean, card_page, args.rounds)
+
+    results = {
+        "items": args.size,
+        "legacy": {"cpu_ms": round(legacy_ms, 3), "bytes": legacy_bytes},
+        "lean": {"cpu_ms": round(lean_ms, 3), "bytes": lean_bytes},
+        "cpu_speedup": round(legacy_ms / lean_ms, 1) if lean_ms else None,
+        "bytes_saved_pct": round(100 * (1 - lean_bytes / legacy_bytes), 1),
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,50 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import APIRouter, FastAPI, HTTPException, Depends, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from pymongo import MongoClient
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, IndexModel, UpdateOne, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, PyMongoError
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 from bson import ObjectId
-from pydantic import BaseModel
-from typing import Optional, List
-from datetime import datetime, timedelta
-from passlib.context import CryptContext
+from bson.errors import InvalidId
+from contextlib import asynccontextmanager, suppress
+from starlette.routing import Match
+from pydantic import BaseModel, Field, ValidationError
+from typing import Optional, List, Literal
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import asyncio
+import base64
+import hashlib
+import json
 import jwt
+import logging
+import math
+import multiprocessing
 import os
+import re
+import time
 from uuid import uuid4
 
+from events import EventBus, SubscribersExhausted, follow_changes
+from compression import CompressionMiddleware, negotiate
+from cache import MemoryCache, RedisCache
+from metrics import CommandMetrics, PoolMetrics, Registry
+from ratelimit import MemoryBuckets, RedisBuckets
+from recommend import Recommender
+from rankings import RANKING_KINDS, push_to_rankings, ranking_id, ranking_projection, rebuild_rankings, top_items
+from migrate_content import migrate_catalog
+from migrate_profiles import migrate_user
+from passwords import get_password_hash, verify_password
+from progress import ProgressBuffer
+from search import SearchIndex
+from tracing import CommandTracer, FileExporter, SlowQueryLog, Tracer, span, traced
+
+logger = logging.getLogger(__name__)
+
 # Configuration
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
@@ -18,26 +52,646 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 # Database
 MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017/netflix_clone")
-client = MongoClient(MONGO_URL)
-db = client.netflix_clone
+MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME", "netflix_clone")
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get("MONGO_SOCKET_TIMEOUT_MS", "10000"))
+# Read routing: `db` (users, profiles, watchlists and every write) reads with
+# MONGO_READ_PREFERENCE, primary unless overridden; `catalog_db` sends catalog
+# and search reads to secondaries when there are any, skipping members more
+# than CATALOG_MAX_STALENESS_SECONDS behind (at least 90, the driver minimum;
+# -1 for no bound). Catalog reads may therefore briefly miss a new title.
+MONGO_READ_PREFERENCE = os.environ.get("MONGO_READ_PREFERENCE", "primary")
+CATALOG_READ_PREFERENCE = os.environ.get("CATALOG_READ_PREFERENCE", "secondaryPreferred")
+CATALOG_MAX_STALENESS_SECONDS = int(os.environ.get("CATALOG_MAX_STALENESS_SECONDS", "90"))
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+def read_preference(mode: str, max_staleness: int = -1):
+    if mode not in READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference: {mode}")
+    if mode == "primary":
+        return Primary()
+    return READ_PREFERENCES[mode](max_staleness=max_staleness)
+
+# Set in lifespan() so the client is bound to the running event loop
+client = None
+db = None
+catalog_db = None
+primary_db = None  # auth lookups, whatever MONGO_READ_PREFERENCE says
+
+# Metrics, exposed in the Prometheus text format on /metrics
+metrics = Registry()
+mongo_command_metrics = CommandMetrics(metrics)
+mongo_pool_metrics = PoolMetrics(metrics)
+
+# Tracing (opt-in): OTLP/JSON spans for sampled requests appended to
+# TRACE_FILE, and Mongo commands slower than SLOW_QUERY_MS logged with
+# their explain plan
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "false").lower() == "true"
+TRACE_FILE = os.environ.get("TRACE_FILE", "traces.jsonl")
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_SERVICE_NAME = os.environ.get("TRACE_SERVICE_NAME", "netflix-clone-api")
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "0"))  # 0 disables
+
+tracer = Tracer(sample_rate=TRACE_SAMPLE_RATE)
+slow_query_log = SlowQueryLog(SLOW_QUERY_MS, MONGO_URL) if SLOW_QUERY_MS > 0 else None
+mongo_command_tracer = CommandTracer(slow_query_log)
+
+def create_mongo_client():
+    listeners = [mongo_command_metrics, mongo_pool_metrics]
+    if TRACING_ENABLED or slow_query_log:
+        listeners.append(mongo_command_tracer)
+    return AsyncIOMotorClient(
+        MONGO_URL,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        read_preference=read_preference(MONGO_READ_PREFERENCE),
+        event_listeners=listeners,
+    )
+
+# Index registry, applied at startup and audited by check_indexes.py
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "profiles": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("created_at", ASCENDING)], name="user_created_at"),
+    ],
+    "watchlist_items": [
+        IndexModel([("profile_id", ASCENDING), ("content_id", ASCENDING)], name="profile_content_unique", unique=True),
+        IndexModel([("profile_id", ASCENDING), ("added_at", DESCENDING), ("content_id", DESCENDING)],
+                   name="profile_added_at"),
+    ],
+    # Write-behind upserts rely on the unique key to drop out-of-order writes (see progress.py)
+    "playback_progress": [
+        IndexModel([("profile_id", ASCENDING), ("content_id", ASCENDING)], name="profile_content_unique", unique=True),
+        IndexModel([("profile_id", ASCENDING), ("finished", ASCENDING), ("updated_at", DESCENDING)],
+                   name="profile_finished_updated_at"),
+    ],
+    # Movies and series share one collection, told apart by content_type
+    "content": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("content_type", ASCENDING), ("rating", DESCENDING), ("_id", DESCENDING)],
+                   name="type_rating_id"),
+        IndexModel([("content_type", ASCENDING), ("genre", ASCENDING), ("rating", DESCENDING), ("_id", DESCENDING)],
+                   name="type_genre_rating_id"),
+        IndexModel([("genre", ASCENDING), ("rating", DESCENDING), ("_id", DESCENDING)], name="genre_rating_id"),
+        IndexModel([("genre", ASCENDING), ("year", DESCENDING)], name="genre_year"),
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+        # Search index refresh (sync_search_index)
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+        # Per-genre ranking rebuilds (see rankings.py)
+        IndexModel([("content_type", ASCENDING), ("genre", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="type_genre_created_at"),
+        IndexModel([("content_type", ASCENDING), ("genre", ASCENDING), ("watchlist_count", DESCENDING),
+                    ("_id", DESCENDING)], name="type_genre_watchlist"),
+    ],
+}
+
+async def ensure_indexes(database):
+    for collection, indexes in INDEXES.items():
+        await database[collection].create_indexes(indexes)
+
+# Catalog scopes as they appear in routes and cache keys, and the
+# content_type each one maps to in the content collection
+CONTENT_TYPES = {"movies": "movie", "series": "series"}
+CONTENT_SCOPES = {content_type: scope for scope, content_type in CONTENT_TYPES.items()}
+
+async def ensure_content_collection(database):
+    # First start on this build: copy the legacy movies/series collections over
+    if await database.content.estimated_document_count() == 0:
+        copied = await migrate_catalog(database)
+        if any(copied.values()):
+            logger.info("Migrated legacy catalog into content: %s", copied)
+
+# Full-text search index, loaded from Mongo at startup and updated by the add
+# endpoints. Every catalog write stamps updated_at with the server's clock
+# ($currentDate), so titles added or updated through other workers are
+# picked up on refresh. A write can still become visible after a later one
+# (concurrent writers, a secondary catching up), so every refresh re-reads
+# SEARCH_SYNC_OVERLAP_SECONDS before the newest stamp it has seen; keep it
+# above the worst replication lag. Titles already indexed at the same
+# stamp are skipped.
+SEARCH_REFRESH_SECONDS = float(os.environ.get("SEARCH_REFRESH_SECONDS", "30"))
+SEARCH_SYNC_OVERLAP_SECONDS = float(os.environ.get(
+    "SEARCH_SYNC_OVERLAP_SECONDS", str(max(120, CATALOG_MAX_STALENESS_SECONDS + 30))
+))
+
+search_index = SearchIndex()
+search_watermark = None
+
+async def sync_search_index(database):
+    global search_watermark
+    query = {}
+    if search_watermark:
+        query["updated_at"] = {"$gte": search_watermark - timedelta(seconds=SEARCH_SYNC_OVERLAP_SECONDS)}
+    async for doc in database.content.find(query):
+        updated_at = doc.get("updated_at")
+        indexed = search_index.docs.get(doc["id"])
+        if indexed is None or (updated_at and indexed.get("updated_at") != updated_at):
+            search_index.add(doc, doc["content_type"])
+        if updated_at and (search_watermark is None or updated_at > search_watermark):
+            search_watermark = updated_at
+
+async def refresh_search_index():
+    while True:
+        await asyncio.sleep(SEARCH_REFRESH_SECONDS)
+        try:
+            await sync_search_index(catalog_db)
+        except Exception:
+            logger.exception("Search index refresh failed")
+
+# Catalog read cache: list pages per genre/limit and documents per id.
+# The add endpoints invalidate list pages; other workers catch up after the TTL
+# unless CATALOG_CACHE_REDIS_URL points every worker at one shared cache.
+CATALOG_CACHE_MAX_ENTRIES = int(os.environ.get("CATALOG_CACHE_MAX_ENTRIES", "1024"))
+CATALOG_CACHE_TTL_SECONDS = float(os.environ.get("CATALOG_CACHE_TTL_SECONDS", "60"))
+CATALOG_CACHE_REDIS_URL = os.environ.get("CATALOG_CACHE_REDIS_URL")
+
+catalog_cache = None
+
+def create_catalog_cache():
+    if CATALOG_CACHE_REDIS_URL:
+        return RedisCache.from_url(CATALOG_CACHE_REDIS_URL, ttl=CATALOG_CACHE_TTL_SECONDS)
+    return MemoryCache(max_entries=CATALOG_CACHE_MAX_ENTRIES, ttl=CATALOG_CACHE_TTL_SECONDS)
+
+# Auth caches. Verified token claims never change, so they stay in-process.
+# User snapshots (profiles + watchlists) are dropped on every profile or
+# watchlist write, and share the Redis backend when one is configured so
+# that the drop reaches every worker; otherwise they are kept short-lived.
+TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+TOKEN_CACHE_TTL_SECONDS = float(os.environ.get("TOKEN_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.environ.get("USER_CACHE_MAX_ENTRIES", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", "15"))
+
+token_cache = MemoryCache(max_entries=TOKEN_CACHE_MAX_ENTRIES, ttl=TOKEN_CACHE_TTL_SECONDS)
+user_cache = None
+
+def create_user_cache():
+    if CATALOG_CACHE_REDIS_URL:
+        return RedisCache.from_url(CATALOG_CACHE_REDIS_URL, ttl=USER_CACHE_TTL_SECONDS, namespace="users:")
+    return MemoryCache(max_entries=USER_CACHE_MAX_ENTRIES, ttl=USER_CACHE_TTL_SECONDS)
+
+# Read-your-writes for user data when MONGO_READ_PREFERENCE lets those reads
+# leave the primary: requests run in causally consistent sessions that start
+# from the clock of the user's last write. Clocks outlive replication lag and
+# are shared across workers through the Redis backend when there is one.
+CAUSAL_USER_SESSIONS = MONGO_READ_PREFERENCE != "primary"
+USER_CLOCK_TTL_SECONDS = float(os.environ.get("USER_CLOCK_TTL_SECONDS", "300"))
+
+user_clocks = None
+
+def create_user_clocks():
+    if CATALOG_CACHE_REDIS_URL:
+        return RedisCache.from_url(CATALOG_CACHE_REDIS_URL, ttl=USER_CLOCK_TTL_SECONDS, namespace="clocks:")
+    return MemoryCache(max_entries=USER_CACHE_MAX_ENTRIES, ttl=USER_CLOCK_TTL_SECONDS)
+
+@asynccontextmanager
+async def user_session(user_id: str, writes: bool = False):
+    if not CAUSAL_USER_SESSIONS:
+        yield None
+        return
+    async with await client.start_session(causal_consistency=True) as session:
+        clock = await user_clocks.get(user_id)
+        if clock:
+            session.advance_cluster_time(clock["cluster_time"])
+            session.advance_operation_time(clock["operation_time"])
+        yield session
+        if writes and session.operation_time is not None:
+            await user_clocks.set(
+                user_id, {"cluster_time": session.cluster_time, "operation_time": session.operation_time}
+            )
+
+# Catalog versions, one per collection, persisted in catalog_meta and bumped
+# by the add endpoints. They drive HTTP validators, and a bump seen from
+# another worker also drops everything this worker cached for that scope:
+# list pages, and detail documents a bulk import may have updated.
+#
+# Cached pages are tagged with the version current when they were filled,
+# but fills read from secondaries, which may not have replicated that
+# version's writes yet. So each version keeps the cluster time at which
+# this worker saw it, and fills run in a causally consistent session from
+# there (catalog_session): a lagging secondary waits until it has caught up
+# instead of answering with the previous version's data.
+CATALOG_VERSION_REFRESH_SECONDS = float(os.environ.get("CATALOG_VERSION_REFRESH_SECONDS", "5"))
+CAUSAL_CATALOG_READS = CATALOG_READ_PREFERENCE != "primary"
+
+catalog_versions = {
+    "movies": {"version": 0, "updated_at": datetime(1970, 1, 1)},
+    "series": {"version": 0, "updated_at": datetime(1970, 1, 1)},
+}
+catalog_clocks = {}
+
+@asynccontextmanager
+async def clock_session():
+    """A causally consistent session whose clock is recorded for catalog reads, or None"""
+    if not CAUSAL_CATALOG_READS:
+        yield None
+        return
+    async with await client.start_session(causal_consistency=True) as session:
+        yield session
+
+def session_clock(session):
+    if session is None or session.operation_time is None:
+        return None
+    return {"cluster_time": session.cluster_time, "operation_time": session.operation_time}
+
+async def set_catalog_version(scope: str, doc: dict, clock):
+    catalog_versions[scope] = {"version": doc["version"], "updated_at": doc["updated_at"]}
+    catalog_clocks[scope] = clock
+    await catalog_cache.invalidate(f"{scope}:")
+
+async def load_catalog_versions(database):
+    async with clock_session() as session:
+        docs = await database.catalog_meta.find(
+            {"_id": {"$in": list(catalog_versions)}}, session=session
+        ).to_list(length=None)
+    for doc in docs:
+        scope = doc["_id"]
+        if doc["version"] != catalog_versions[scope]["version"]:
+            await set_catalog_version(scope, doc, session_clock(session))
+
+async def bump_catalog_version(scope):
+    async with clock_session() as session:
+        doc = await db.catalog_meta.find_one_and_update(
+            {"_id": scope},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow().replace(microsecond=0)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            session=session,
+        )
+    await set_catalog_version(scope, doc, session_clock(session))
+
+@asynccontextmanager
+async def catalog_session(*scopes):
+    """Session for cache fills that reads at least the catalog versions of `scopes` (None: no need)"""
+    clocks = [catalog_clocks[scope] for scope in scopes if catalog_clocks.get(scope)]
+    if not CAUSAL_CATALOG_READS or not clocks:
+        yield None
+        return
+    async with await client.start_session(causal_consistency=True) as session:
+        for clock in clocks:
+            if clock["cluster_time"] is not None:
+                session.advance_cluster_time(clock["cluster_time"])
+            session.advance_operation_time(clock["operation_time"])
+        yield session
+
+async def refresh_catalog_versions():
+    while True:
+        await asyncio.sleep(CATALOG_VERSION_REFRESH_SECONDS)
+        try:
+            await load_catalog_versions(db)
+        except Exception:
+            logger.exception("Catalog version refresh failed")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global client, db, catalog_db, primary_db, hash_pool, catalog_cache, user_cache, user_clocks, rate_limiter, event_bus
+    client = create_mongo_client()
+    db = client[MONGO_DB_NAME]
+    catalog_db = client.get_database(
+        MONGO_DB_NAME, read_preference=read_preference(CATALOG_READ_PREFERENCE, CATALOG_MAX_STALENESS_SECONDS)
+    )
+    primary_db = client.get_database(MONGO_DB_NAME, read_preference=Primary())
+    catalog_cache = create_catalog_cache()
+    user_cache = create_user_cache()
+    user_clocks = create_user_clocks()
+    rate_limiter = create_rate_limiter()
+    event_bus = create_event_bus()
+    await ensure_indexes(db)
+    await ensure_content_collection(db)
+    await load_catalog_versions(db)
+    if await db.rankings.estimated_document_count() == 0:
+        await rebuild_rankings(db, CONTENT_SCOPES, VIEW_FIELDS["card"], RANKING_SIZE)
+    try:
+        for kids in (False, True):
+            await get_browse_rows(kids)
+    except Exception:
+        logger.exception("Precomputing browse rows failed")
+    try:
+        await refresh_recommender(catalog_db)
+    except Exception:
+        logger.exception("Building recommendations failed")
+    await sync_search_index(catalog_db)
+    search_index.warm()
+    search_refresh = asyncio.create_task(refresh_search_index())
+    version_refresh = asyncio.create_task(refresh_catalog_versions())
+    ranking_refresh = asyncio.create_task(refresh_rankings())
+    recommendation_refresh = asyncio.create_task(refresh_recommendations())
+    change_feeds = await start_change_feeds(db) if EVENTS_FROM_CHANGE_STREAMS else []
+    progress_writer = asyncio.create_task(write_progress())
+    hash_pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, mp_context=hash_pool_context)
+    if TRACING_ENABLED:
+        tracer.exporter = FileExporter(TRACE_FILE, TRACE_SERVICE_NAME)
+    try:
+        yield
+    finally:
+        if tracer.exporter:
+            tracer.exporter.close()
+            tracer.exporter = None
+        if slow_query_log:
+            slow_query_log.close()
+        for feed in change_feeds:
+            feed.cancel()
+        progress_writer.cancel()
+        with suppress(asyncio.CancelledError):
+            await progress_writer  # a cancelled flush puts its batch back first
+        try:
+            await progress_buffer.flush(db.playback_progress)
+        except Exception:
+            logger.exception("Final playback progress flush failed; %d entries lost", len(progress_buffer))
+        recommendation_refresh.cancel()
+        ranking_refresh.cancel()
+        version_refresh.cancel()
+        search_refresh.cancel()
+        hash_pool.shutdown(wait=False, cancel_futures=True)
+        hash_pool = None
+        client.close()
+        client = None
+        db = None
+        catalog_db = None
+        primary_db = None
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs in a process pool so a login storm never stalls the event loop.
+# Once PASSWORD_HASH_MAX_PENDING jobs are queued, new ones get a 503. The
+# cores are shared between the WEB_CONCURRENCY server workers' pools. Pool
+# processes come from a fork server rather than being forked from a worker
+# whose driver threads may hold locks, and only import passwords.py.
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+PASSWORD_HASH_WORKERS = int(os.environ.get(
+    "PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY))
+))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 4)))
+PASSWORD_HASH_RETRY_AFTER = int(os.environ.get("PASSWORD_HASH_RETRY_AFTER", "1"))
+
+hash_pool = None
+hash_pool_context = multiprocessing.get_context("forkserver")
+hash_pool_context.set_forkserver_preload(["passwords"])
+hash_stats = {"pending": 0, "peak_pending": 0, "completed": 0, "rejected": 0}
+hash_latencies = deque(maxlen=1024)
+hash_seconds = metrics.histogram("password_hash_seconds", "bcrypt hash/verify time including queueing",
+                                 buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0))
+hash_rejections = metrics.counter("password_hash_rejected_total", "bcrypt jobs shed with a 503")
 
 # Security
 security = HTTPBearer()
 
-# FastAPI app
-app = FastAPI(title="Netflix Clone API", version="1.0.0")
+class TracedResponse(ORJSONResponse):
+    """orjson encoding, timed as its own span when the request is traced"""
+
+    def render(self, content) -> bytes:
+        with span("encode_response"):
+            return super().render(content)
+
+# Routes and middleware are declared here and assembled by create_app()
+router = APIRouter()
+
+# Compression. Catalog reads are encoded once per (ETag, encoding) and served
+# from encoded_cache until their catalog version moves on; everything else
+# over COMPRESSION_MIN_BYTES is compressed per response.
+COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+ENCODED_CACHE_MAX_ENTRIES = int(os.environ.get("ENCODED_CACHE_MAX_ENTRIES", "512"))
+
+encoded_cache = MemoryCache(max_entries=ENCODED_CACHE_MAX_ENTRIES, ttl=CATALOG_CACHE_TTL_SECONDS)
+
+# HTTP caching for catalog reads: (path, catalog scope, Cache-Control)
+CACHE_POLICIES = [
+    (re.compile(r"^/api/movies$"), "movies", "public, max-age=30, stale-while-revalidate=300"),
+    (re.compile(r"^/api/movies/[^/]+$"), "movies", "public, max-age=300, stale-while-revalidate=3600"),
+    (re.compile(r"^/api/series$"), "series", "public, max-age=30, stale-while-revalidate=300"),
+    (re.compile(r"^/api/series/[^/]+$"), "series", "public, max-age=300, stale-while-revalidate=3600"),
+]
+
+def match_cache_policy(path):
+    for pattern, scope, cache_control in CACHE_POLICIES:
+        if pattern.match(path):
+            return scope, cache_control
+    return None
+
+def catalog_etag(request: Request, scope: str):
+    version = catalog_versions[scope]["version"]
+    digest = hashlib.blake2b(
+        f"{request.url.path}?{sorted(request.query_params.multi_items())}".encode(), digest_size=8
+    ).hexdigest()
+    return f'"{scope}-{version}-{digest}"'
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime, exists: bool = False):
+    """`If-None-Match: *` only matches once the resource is known to `exist`"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in candidates or (exists and "*" in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(tzinfo=timezone.utc) <= since
+    return False
+
+async def conditional_get(request: Request, call_next):
+    policy = match_cache_policy(request.url.path) if request.method in ("GET", "HEAD") else None
+    if policy is None:
+        return await call_next(request)
+
+    scope, cache_control = policy
+    etag = catalog_etag(request, scope)
+    last_modified = catalog_versions[scope]["updated_at"]
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": cache_control,
+    }
+
+    # Answered from the in-memory version alone, no database work; a bare "*"
+    # has to wait for the handler, since the id in the path may not exist
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    encoding = negotiate(request.headers.get("accept-encoding", "")) if COMPRESSION_ENABLED else None
+    if encoding:
+        request.scope["encoded_cache_key"] = etag
+        cached = await encoded_cache.get(f"{etag}:{encoding}")
+        if cached is not None:
+            if is_not_modified(request, etag, last_modified, exists=True):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            body, encoded_headers = cached
+            # Encoded representations get a weak validator, like nginx's gzip
+            return Response(body, headers={**encoded_headers, **headers, "ETag": f"W/{etag}"})
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        if is_not_modified(request, etag, last_modified, exists=True):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        if "content-encoding" in response.headers:
+            response.headers["ETag"] = f"W/{etag}"
+    return response
+
+# The matched route's path template, e.g. /api/movies/{movie_id}
+def route_template(request: Request):
+    # Kept on the scope, which every middleware layer shares
+    template = request.scope.get("route_template")
+    if template is None:
+        template = "unmatched"
+        for route in request.app.router.routes:
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                template = route.path
+                break
+        request.scope["route_template"] = template
+    return template
+
+# Rate limiting on the expensive routes: every request is charged the route's
+# cost in its IP's token bucket and, with a valid bearer token, in its user's
+# as well, and is refused when either runs dry, so tokens shared from one
+# address do not multiply its budget. The IP bucket is the address-wide one
+# and is sized for several users behind one NAT. A cap on each client's (the
+# user's, else the IP's) concurrent expensive requests applies per worker.
+# Buckets are shared across workers when RATE_LIMIT_REDIS_URL is set.
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_REDIS_URL = os.environ.get("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_IP_CAPACITY = float(os.environ.get("RATE_LIMIT_IP_CAPACITY", "240"))
+RATE_LIMIT_IP_REFILL_PER_SECOND = float(os.environ.get("RATE_LIMIT_IP_REFILL_PER_SECOND", "4"))
+RATE_LIMIT_USER_CAPACITY = float(os.environ.get("RATE_LIMIT_USER_CAPACITY", "120"))
+RATE_LIMIT_USER_REFILL_PER_SECOND = float(os.environ.get("RATE_LIMIT_USER_REFILL_PER_SECOND", "2"))
+RATE_LIMIT_MAX_CONCURRENT = int(os.environ.get("RATE_LIMIT_MAX_CONCURRENT", "8"))
+RATE_LIMIT_TRUST_FORWARDED = os.environ.get("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+
+# Tokens per request, keyed "METHOD route"; RATE_LIMIT_COSTS (JSON) overrides
+RATE_LIMIT_COSTS = {
+    # Charged to the IP alone: 6 registrations or 12 logins at once, then one per 10s / 5s
+    "POST /api/auth/register": 40,
+    "POST /api/auth/login": 20,
+    "GET /api/search": 1,
+    "GET /api/search/suggest": 0.5,
+    "POST /api/content/batch": 1,
+    "POST /api/movies/bulk": 30,
+    "POST /api/series/bulk": 30,
+    **json.loads(os.environ.get("RATE_LIMIT_COSTS", "{}")),
+}
+
+rate_limiter = None
+client_in_flight = {}
+rate_limited = metrics.counter("rate_limited_total", "Requests refused with 429", ("route", "scope", "reason"))
 
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def create_rate_limiter():
+    if RATE_LIMIT_REDIS_URL:
+        return RedisBuckets.from_url(RATE_LIMIT_REDIS_URL)
+    return MemoryBuckets()
+
+def bucket_size(scope: str):
+    """(capacity, refill per second) of an "ip" or "user" bucket"""
+    if scope == "user":
+        return RATE_LIMIT_USER_CAPACITY, RATE_LIMIT_USER_REFILL_PER_SECOND
+    return RATE_LIMIT_IP_CAPACITY, RATE_LIMIT_IP_REFILL_PER_SECOND
+
+def rate_limit_keys(request: Request):
+    """The (scope, client id) buckets a request is charged to: its user if authenticated, then its IP"""
+    keys = []
+    authorization = request.headers.get("authorization", "")
+    if authorization[:7].lower() == "bearer ":
+        try:
+            keys.append(("user", jwt.decode(authorization[7:], SECRET_KEY, algorithms=[ALGORITHM])["sub"]))
+        except (jwt.PyJWTError, KeyError):
+            pass
+    if RATE_LIMIT_TRUST_FORWARDED and request.headers.get("x-forwarded-for"):
+        keys.append(("ip", request.headers["x-forwarded-for"].split(",")[0].strip()))
+    else:
+        keys.append(("ip", request.client.host if request.client else "unknown"))
+    return keys
+
+def too_many_requests(retry_after: float):
+    return TracedResponse(
+        {"detail": "Too many requests, please retry later"},
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+async def rate_limit(request: Request, call_next):
+    route = route_template(request)
+    cost = RATE_LIMIT_COSTS.get(f"{request.method} {route}") if RATE_LIMIT_ENABLED else None
+    if not cost:
+        return await call_next(request)
+
+    keys = [(scope, f"{scope}:{client_id}") for scope, client_id in rate_limit_keys(request)]
+    scope, key = keys[0]
+    if client_in_flight.get(key, 0) >= RATE_LIMIT_MAX_CONCURRENT:
+        rate_limited.inc(route=route, scope=scope, reason="concurrency")
+        return too_many_requests(1)
+
+    # The user's bucket first, so a request it refuses costs the shared IP bucket nothing
+    for bucket_scope, bucket_key in keys:
+        try:
+            retry_after = await rate_limiter.take(bucket_key, cost, *bucket_size(bucket_scope))
+        except Exception:
+            # A broken shared backend must not take the API down with it
+            logger.exception("Rate limiter backend failed, letting the request through")
+            retry_after = 0.0
+        if retry_after > 0:
+            rate_limited.inc(route=route, scope=bucket_scope, reason="rate")
+            return too_many_requests(retry_after)
+
+    client_in_flight[key] = client_in_flight.get(key, 0) + 1
+    try:
+        return await call_next(request)
+    finally:
+        client_in_flight[key] -= 1
+        if not client_in_flight[key]:
+            del client_in_flight[key]
+
+# Request metrics, labelled by route template so ids don't explode cardinality.
+# Registered outside the rate limiter so refused requests are counted too.
+http_requests = metrics.counter("http_requests_total", "HTTP requests served", ("method", "route", "status"))
+http_duration = metrics.histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+http_in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests being served", ("method", "route"))
+
+async def record_request_metrics(request: Request, call_next):
+    labels = {"method": request.method, "route": route_template(request)}
+    http_in_flight.inc(**labels)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        http_duration.observe(time.perf_counter() - started, **labels)
+        http_requests.inc(status=status_code, **labels)
+        http_in_flight.dec(**labels)
+
+# Tracing middleware, outermost so the root span covers the whole stack
+async def trace_requests(request: Request, call_next):
+    if not tracer.enabled:
+        return await call_next(request)
+    route = route_template(request)
+    with tracer.start_trace(f"{request.method} {route}", **{
+        "http.method": request.method,
+        "http.route": route,
+        "http.target": request.url.path,
+    }) as root:
+        response = await call_next(request)
+        if root is not None:
+            root.attributes["http.status_code"] = response.status_code
+        return response
 
 # Pydantic models
 class UserRegister(BaseModel):
@@ -75,12 +729,159 @@ class Series(BaseModel):
     seasons: int
     episodes: int
 
+# Response models. Their fields are also the Mongo projection for each view,
+# so list pages never pull description/created_at out of the database.
+class ContentCard(BaseModel):
+    id: str
+    title: str
+    genre: str
+    year: int
+    rating: float
+    image_url: str
+    trailer_url: str
+    duration: Optional[int] = None  # movies only
+    seasons: Optional[int] = None  # series only
+    episodes: Optional[int] = None  # series only
+    content_type: Optional[str] = None  # "movie" or "series"
+
+class ContentDetail(ContentCard):
+    description: str
+    created_at: Optional[datetime] = None
+
+VIEWS = {"card": ContentCard, "detail": ContentDetail}
+View = Literal["card", "detail"]
+
+VIEW_FIELDS = {view: list(model.model_fields) for view, model in VIEWS.items()}
+PROJECTIONS = {
+    view: {"_id": 0, **{field: 1 for field in fields}}
+    for view, fields in VIEW_FIELDS.items()
+}
+
+CONTENT_BATCH_MAX_IDS = 100
+
+class ContentBatchRequest(BaseModel):
+    ids: List[str] = Field(..., max_length=CONTENT_BATCH_MAX_IDS)
+    view: View = "detail"
+
+class ContentBatchResponse(BaseModel):
+    items: List[ContentDetail]
+    missing: List[str]
+
+def project(doc: dict, view: str):
+    return {field: doc[field] for field in VIEW_FIELDS[view] if field in doc}
+
 # Utility functions
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def run_password_task(func, *args):
+    if hash_stats["pending"] >= PASSWORD_HASH_MAX_PENDING:
+        hash_stats["rejected"] += 1
+        hash_rejections.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry",
+            headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+        )
+
+    hash_stats["pending"] += 1
+    hash_stats["peak_pending"] = max(hash_stats["peak_pending"], hash_stats["pending"])
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(hash_pool, func, *args)
+    finally:
+        hash_stats["pending"] -= 1
+        hash_stats["completed"] += 1
+        hash_latencies.append(time.perf_counter() - started)
+        hash_seconds.observe(time.perf_counter() - started)
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def password_hash_metrics():
+    latencies = list(hash_latencies)
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "queue_depth": hash_stats["pending"],
+        "peak_queue_depth": hash_stats["peak_pending"],
+        "completed": hash_stats["completed"],
+        "rejected": hash_stats["rejected"],
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(max(latencies, default=0.0) * 1000, 2),
+        },
+    }
+
+# Keyset pagination: the cursor is the sort key of the last item served,
+# base64-encoded so clients treat it as opaque.
+MAX_PAGE_SIZE = 100
+
+def page_size(limit: int):
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def encode_cursor(values: dict):
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+# Every cursor field and the types it may hold: sort values (r)ating and
+# (s)core, last (i)d / (c)ontent id, (a)dded_at as ISO text, (n) items served
+CURSOR_FIELD_TYPES = {"r": (int, float), "s": (int, float), "i": str, "c": str, "a": str, "n": int}
+
+def decode_cursor(cursor: str, *fields):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        decoded = [values[field] for field in fields]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    for field, value in zip(fields, decoded):
+        if isinstance(value, bool) or not isinstance(value, CURSOR_FIELD_TYPES[field]) or (field == "n" and value < 0):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return decoded
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+def json_response(content, next_cursor: Optional[str] = None):
+    """Serialize straight to orjson, skipping FastAPI's generic jsonable_encoder pass"""
+    response = TracedResponse(content)
+    set_next_cursor(response, next_cursor)
+    return response
+
+async def list_catalog(scope: str, genre: Optional[str], limit: int, cursor: Optional[str],
+                       view: str = "card"):
+    """One page of movies or series ordered by rating, newest _id first on ties"""
+    query = {"content_type": CONTENT_TYPES[scope]}
+    if genre:
+        query["genre"] = genre
+    if cursor:
+        rating, last_id = decode_cursor(cursor, "r", "i")
+        try:
+            last_id = ObjectId(last_id)
+        except (InvalidId, TypeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query["$or"] = [
+            {"rating": {"$lt": rating}},
+            {"rating": rating, "_id": {"$lt": last_id}},
+        ]
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+    # _id is only fetched to build the cursor
+    projection = dict(PROJECTIONS[view], _id=1)
+    async with catalog_session(scope) as session:
+        items = await catalog_db.content.find(query, projection, session=session).sort(
+            [("rating", DESCENDING), ("_id", DESCENDING)]
+        ).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor({"r": items[-1]["rating"], "i": str(items[-1]["_id"])})
+    for item in items:
+        del item["_id"]
+    return {"items": items, "next_cursor": next_cursor}
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -92,16 +893,27 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+@traced("dependency verify_token")
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    cached = await token_cache.get(token)
+    if cached is not None:
+        user_id, expires_at = cached
+        if expires_at > time.time():
+            return user_id
+
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        with span("jwt.decode"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
-        if user_id is None:
+        # Event stream tokens travel in URLs; they are only good for opening a stream
+        if user_id is None or payload.get("scope") == "events":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        await token_cache.set(token, (user_id, payload["exp"]))
         return user_id
     except jwt.PyJWTError:
         raise HTTPException(
@@ -110,11 +922,35 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+@traced("dependency get_user_snapshot")
+async def get_user_snapshot(user_id: str = Depends(verify_token)):
+    """The caller's user document and profiles without the password hash, resolved once per request"""
+    user = await user_cache.get(user_id)
+    if user is None:
+        async with user_session(user_id) as session:
+            user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0}, session=session)
+            if not user:
+                raise HTTPException(status_code=404, detail="User not found")
+            if user.get("profiles"):
+                # Still on the embedded layout: move it before reading profiles
+                await migrate_user(db, user)
+            user["profiles"] = await db.profiles.find(
+                {"user_id": user_id}, {"_id": 0, "user_id": 0}, session=session
+            ).sort("created_at", ASCENDING).to_list(length=None)
+        await user_cache.set(user_id, user)
+    return user
+
+def find_profile(user: dict, profile_id: str):
+    profile = next((p for p in user.get("profiles", []) if p["id"] == profile_id), None)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
 # Authentication endpoints
-@app.post("/api/auth/register")
+@router.post("/api/auth/register")
 async def register(user: UserRegister):
     # Check if user exists
-    if db.users.find_one({"email": user.email}):
+    if await primary_db.users.find_one({"email": user.email}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -122,18 +958,17 @@ async def register(user: UserRegister):
     
     # Create new user
     user_id = str(uuid4())
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await run_password_task(get_password_hash, user.password)
     
     user_doc = {
         "id": user_id,
         "email": user.email,
         "password": hashed_password,
         "full_name": user.full_name,
-        "created_at": datetime.utcnow(),
-        "profiles": []
+        "created_at": datetime.utcnow()
     }
     
-    db.users.insert_one(user_doc)
+    await db.users.insert_one(user_doc)
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -143,11 +978,12 @@ async def register(user: UserRegister):
     
     return {"access_token": access_token, "token_type": "bearer", "user_id": user_id}
 
-@app.post("/api/auth/login")
+@router.post("/api/auth/login")
 async def login(user: UserLogin):
     # Find user
-    user_doc = db.users.find_one({"email": user.email})
-    if not user_doc or not verify_password(user.password, user_doc["password"]):
+    # Always the primary, so an account can log in right after registering
+    user_doc = await primary_db.users.find_one({"email": user.email})
+    if not user_doc or not await run_password_task(verify_password, user.password, user_doc["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -162,12 +998,8 @@ async def login(user: UserLogin):
     
     return {"access_token": access_token, "token_type": "bearer", "user_id": user_doc["id"]}
 
-@app.get("/api/auth/me")
-async def get_current_user(user_id: str = Depends(verify_token)):
-    user = db.users.find_one({"id": user_id})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
+@router.get("/api/auth/me")
+async def get_current_user(user: dict = Depends(get_user_snapshot)):
     return {
         "id": user["id"],
         "email": user["email"],
@@ -176,56 +1008,59 @@ async def get_current_user(user_id: str = Depends(verify_token)):
     }
 
 # Profile endpoints
-@app.post("/api/profiles")
+@router.post("/api/profiles")
 async def create_profile(profile: Profile, user_id: str = Depends(verify_token)):
     profile_id = str(uuid4())
     profile_doc = {
         "id": profile_id,
+        "user_id": user_id,
         "name": profile.name,
         "avatar": profile.avatar,
         "is_kids": profile.is_kids,
-        "watchlist": [],
         "created_at": datetime.utcnow()
     }
     
-    db.users.update_one(
-        {"id": user_id},
-        {"$push": {"profiles": profile_doc}}
-    )
+    async with user_session(user_id, writes=True) as session:
+        await db.profiles.insert_one(profile_doc, session=session)
+    await user_cache.delete(user_id)
     
     return {"id": profile_id, "message": "Profile created successfully"}
 
-@app.get("/api/profiles")
-async def get_profiles(user_id: str = Depends(verify_token)):
-    user = db.users.find_one({"id": user_id})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
+@router.get("/api/profiles")
+async def get_profiles(user: dict = Depends(get_user_snapshot)):
     return user.get("profiles", [])
 
 # Movies endpoints
-@app.get("/api/movies")
-async def get_movies(genre: Optional[str] = None, limit: int = 20):
-    query = {}
-    if genre:
-        query["genre"] = genre
+@router.get("/api/movies", response_model=List[ContentCard])
+async def get_movies(genre: Optional[str] = None, limit: int = 20, cursor: Optional[str] = None,
+                     view: View = "card"):
+    limit = page_size(limit)
+    cache_key = f"movies:list:{view}:{genre or '*'}:{limit}:{cursor or ''}"
+    page = await catalog_cache.get(cache_key)
+    if page is None:
+        page = await list_catalog("movies", genre, limit, cursor, view)
+        await catalog_cache.set(cache_key, page)
     
-    movies = list(db.movies.find(query).limit(limit))
-    for movie in movies:
-        movie["_id"] = str(movie["_id"])
-    
-    return movies
+    return json_response(page["items"], page["next_cursor"])
 
-@app.get("/api/movies/{movie_id}")
+@router.get("/api/movies/{movie_id}", response_model=ContentDetail)
 async def get_movie(movie_id: str):
-    movie = db.movies.find_one({"id": movie_id})
+    cache_key = f"movies:doc:{movie_id}"
+    movie = await catalog_cache.get(cache_key)
+    if movie is not None:
+        return json_response(movie)
+
+    async with catalog_session("movies") as session:
+        movie = await catalog_db.content.find_one(
+            {"id": movie_id, "content_type": "movie"}, PROJECTIONS["detail"], session=session
+        )
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
     
-    movie["_id"] = str(movie["_id"])
-    return movie
+    await catalog_cache.set(cache_key, movie)
+    return json_response(movie)
 
-@app.post("/api/movies")
+@router.post("/api/movies")
 async def add_movie(movie: Movie, user_id: str = Depends(verify_token)):
     movie_id = str(uuid4())
     movie_doc = {
@@ -238,26 +1073,50 @@ async def add_movie(movie: Movie, user_id: str = Depends(verify_token)):
         "image_url": movie.image_url,
         "trailer_url": movie.trailer_url,
         "duration": movie.duration,
+        "content_type": "movie",
         "created_at": datetime.utcnow()
     }
     
-    db.movies.insert_one(movie_doc)
+    await db.content.update_one(
+        {"id": movie_id}, {"$setOnInsert": movie_doc, "$currentDate": {"updated_at": True}}, upsert=True
+    )
+    search_index.add(movie_doc, "movie")
+    await push_to_rankings(db, [movie_doc], RANKING_KINDS, VIEW_FIELDS["card"], RANKING_SIZE)
+    emit_title_added(movie_doc)
+    await bump_catalog_version("movies")
     return {"id": movie_id, "message": "Movie added successfully"}
 
 # Series endpoints
-@app.get("/api/series")
-async def get_series(genre: Optional[str] = None, limit: int = 20):
-    query = {}
-    if genre:
-        query["genre"] = genre
+@router.get("/api/series", response_model=List[ContentCard])
+async def get_series(genre: Optional[str] = None, limit: int = 20, cursor: Optional[str] = None,
+                     view: View = "card"):
+    limit = page_size(limit)
+    cache_key = f"series:list:{view}:{genre or '*'}:{limit}:{cursor or ''}"
+    page = await catalog_cache.get(cache_key)
+    if page is None:
+        page = await list_catalog("series", genre, limit, cursor, view)
+        await catalog_cache.set(cache_key, page)
     
-    series = list(db.series.find(query).limit(limit))
-    for serie in series:
-        serie["_id"] = str(serie["_id"])
+    return json_response(page["items"], page["next_cursor"])
+
+@router.get("/api/series/{series_id}", response_model=ContentDetail)
+async def get_serie(series_id: str):
+    cache_key = f"series:doc:{series_id}"
+    serie = await catalog_cache.get(cache_key)
+    if serie is not None:
+        return json_response(serie)
+
+    async with catalog_session("series") as session:
+        serie = await catalog_db.content.find_one(
+            {"id": series_id, "content_type": "series"}, PROJECTIONS["detail"], session=session
+        )
+    if not serie:
+        raise HTTPException(status_code=404, detail="Series not found")
     
-    return series
+    await catalog_cache.set(cache_key, serie)
+    return json_response(serie)
 
-@app.post("/api/series")
+@router.post("/api/series")
 async def add_series(series: Series, user_id: str = Depends(verify_token)):
     series_id = str(uuid4())
     series_doc = {
@@ -271,97 +1130,798 @@ async def add_series(series: Series, user_id: str = Depends(verify_token)):
         "trailer_url": series.trailer_url,
         "seasons": series.seasons,
         "episodes": series.episodes,
+        "content_type": "series",
         "created_at": datetime.utcnow()
     }
     
-    db.series.insert_one(series_doc)
+    await db.content.update_one(
+        {"id": series_id}, {"$setOnInsert": series_doc, "$currentDate": {"updated_at": True}}, upsert=True
+    )
+    search_index.add(series_doc, "series")
+    await push_to_rankings(db, [series_doc], RANKING_KINDS, VIEW_FIELDS["card"], RANKING_SIZE)
+    emit_title_added(series_doc)
+    await bump_catalog_version("series")
     return {"id": series_id, "message": "Series added successfully"}
 
-# Search endpoint
-@app.get("/api/search")
-async def search_content(q: str, content_type: Optional[str] = None):
-    results = []
-    
-    # Search movies
-    if not content_type or content_type == "movies":
-        movies = list(db.movies.find({
-            "$or": [
-                {"title": {"$regex": q, "$options": "i"}},
-                {"description": {"$regex": q, "$options": "i"}},
-                {"genre": {"$regex": q, "$options": "i"}}
-            ]
-        }).limit(10))
-        
-        for movie in movies:
-            movie["_id"] = str(movie["_id"])
-            movie["content_type"] = "movie"
-            results.append(movie)
-    
-    # Search series
-    if not content_type or content_type == "series":
-        series = list(db.series.find({
-            "$or": [
-                {"title": {"$regex": q, "$options": "i"}},
-                {"description": {"$regex": q, "$options": "i"}},
-                {"genre": {"$regex": q, "$options": "i"}}
-            ]
-        }).limit(10))
-        
-        for serie in series:
-            serie["_id"] = str(serie["_id"])
-            serie["content_type"] = "series"
-            results.append(serie)
-    
-    return results
+# Bulk catalog ingestion
+# NDJSON bodies, one title per line, validated and written in batches while
+# the body is still streaming in. Rows that carry an id are upserted on it,
+# so re-importing a feed updates titles instead of duplicating them.
+BULK_BATCH_SIZE = int(os.environ.get("BULK_BATCH_SIZE", "1000"))
+BULK_MAX_ERRORS = int(os.environ.get("BULK_MAX_ERRORS", "1000"))
+BULK_MAX_LINE_BYTES = int(os.environ.get("BULK_MAX_LINE_BYTES", str(1024 * 1024)))
 
-# Watchlist endpoints
-@app.post("/api/watchlist/{profile_id}/{content_id}")
-async def add_to_watchlist(profile_id: str, content_id: str, user_id: str = Depends(verify_token)):
-    db.users.update_one(
-        {"id": user_id, "profiles.id": profile_id},
-        {"$addToSet": {"profiles.$.watchlist": content_id}}
+class BulkIngestError(BaseModel):
+    line: int
+    id: Optional[str] = None
+    error: str
+
+class BulkIngestResult(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: List[BulkIngestError]  # first BULK_MAX_ERRORS only
+
+async def ndjson_lines(request: Request):
+    """Yield (line number, line) for every non-blank line of a streamed NDJSON body"""
+    buffer = b""
+    line_number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+        if len(buffer) > BULK_MAX_LINE_BYTES:
+            raise HTTPException(status_code=413, detail=f"Line {line_number + 1} is longer than {BULK_MAX_LINE_BYTES} bytes")
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+def validation_message(exc: ValidationError):
+    return "; ".join(f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}" for error in exc.errors())
+
+async def ingest_catalog(request: Request, model, scope: str):
+    content_type = CONTENT_TYPES[scope]
+    result = {"received": 0, "inserted": 0, "updated": 0, "failed": 0, "errors": []}
+    batch = []
+
+    def reject(line_number: int, error: str, content_id: Optional[str] = None):
+        result["failed"] += 1
+        if len(result["errors"]) < BULK_MAX_ERRORS:
+            result["errors"].append({"line": line_number, "id": content_id, "error": error})
+
+    async def flush():
+        ops = [
+            UpdateOne(
+                {"id": doc["id"], "content_type": content_type},
+                {"$set": {field: value for field, value in doc.items() if field != "created_at"},
+                 "$setOnInsert": {"created_at": doc["created_at"]},
+                 "$currentDate": {"updated_at": True}},
+                upsert=True,
+            )
+            for _, doc in batch
+        ]
+        try:
+            outcome = (await db.content.bulk_write(ops, ordered=False)).bulk_api_result
+        except BulkWriteError as exc:
+            # Unordered: everything except the listed rows was still written
+            outcome = exc.details
+        failed = set()
+        for error in outcome["writeErrors"]:
+            line_number, doc = batch[error["index"]]
+            failed.add(error["index"])
+            reject(line_number, error["errmsg"], doc["id"])
+        result["inserted"] += outcome["nUpserted"]
+        result["updated"] += outcome["nMatched"]
+        for upserted in outcome["upserted"]:
+            emit_title_added(dict(batch[upserted["index"]][1], content_type=content_type))
+
+        written = [doc for index, (_, doc) in enumerate(batch) if index not in failed]
+        search_index.add_many(written, content_type)
+        for doc in written:
+            await catalog_cache.delete(f"{scope}:doc:{doc['id']}")
+        if written:
+            # Re-read so updated titles keep their created_at and watchlist_count
+            stored = await db.content.find(
+                {"id": {"$in": [doc["id"] for doc in written]}}, ranking_projection(VIEW_FIELDS["card"])
+            ).to_list(length=None)
+            await push_to_rankings(db, stored, RANKING_KINDS, VIEW_FIELDS["card"], RANKING_SIZE)
+        batch.clear()
+
+    try:
+        async for line_number, line in ndjson_lines(request):
+            result["received"] += 1
+            try:
+                row = json.loads(line)
+                item = model.model_validate(row)
+            except ValidationError as exc:
+                reject(line_number, validation_message(exc))
+                continue
+            except ValueError as exc:
+                reject(line_number, f"Invalid JSON: {exc}")
+                continue
+            content_id = row.get("id") or str(uuid4())
+            if not isinstance(content_id, str):
+                reject(line_number, "id: Input should be a valid string")
+                continue
+
+            doc = {"id": content_id, **item.model_dump(), "content_type": content_type, "created_at": datetime.utcnow()}
+            batch.append((line_number, doc))
+            if len(batch) >= BULK_BATCH_SIZE:
+                await flush()
+        if batch:
+            await flush()
+    finally:
+        # Also when the body is cut short (413, disconnect): earlier batches are already written
+        if result["inserted"] or result["updated"]:
+            await bump_catalog_version(scope)
+    return result
+
+@router.post("/api/movies/bulk", response_model=BulkIngestResult)
+async def bulk_add_movies(request: Request, user_id: str = Depends(verify_token)):
+    return await ingest_catalog(request, Movie, "movies")
+
+@router.post("/api/series/bulk", response_model=BulkIngestResult)
+async def bulk_add_series(request: Request, user_id: str = Depends(verify_token)):
+    return await ingest_catalog(request, Series, "series")
+
+# Batched content details
+@router.post("/api/content/batch", response_model=ContentBatchResponse)
+async def get_content_batch(request: ContentBatchRequest):
+    ids = list(dict.fromkeys(request.ids))
+    found = {}
+
+    # Per-id detail documents are shared with get_movie/get_serie. Their keys are
+    # scoped by content type, which the search index knows; ids it doesn't know
+    # yet go straight to Mongo rather than being looked up under both scopes
+    keys = []
+    for content_id in ids:
+        indexed = search_index.docs.get(content_id)
+        if indexed:
+            keys.append(f"{CONTENT_SCOPES[indexed['content_type']]}:doc:{content_id}")
+    catalog_cache.record_miss(len(ids) - len(keys))
+    for doc in await catalog_cache.get_many(keys):
+        if doc is not None:
+            found[doc["id"]] = doc
+
+    # One $in for whatever the cache didn't have
+    remaining = [content_id for content_id in ids if content_id not in found]
+    if remaining:
+        async with catalog_session(*CONTENT_TYPES) as session:
+            docs = await catalog_db.content.find(
+                {"id": {"$in": remaining}}, PROJECTIONS["detail"], session=session
+            ).to_list(length=None)
+        for doc in docs:
+            found[doc["id"]] = doc
+            await catalog_cache.set(f"{CONTENT_SCOPES[doc['content_type']]}:doc:{doc['id']}", doc)
+        remaining = [content_id for content_id in remaining if content_id not in found]
+
+    return json_response({
+        "items": [project(found[content_id], request.view) for content_id in request.ids if content_id in found],
+        "missing": remaining,
+    })
+
+# Browse endpoint
+# Kids profiles only get rows built from these genres
+KIDS_GENRES = [genre.strip() for genre in os.environ.get("KIDS_GENRES", "Animation,Family,Kids").split(",")]
+BROWSE_ROW_SIZE = 20
+
+CONTENT_TYPE_LABELS = {"movie": "Movies", "series": "Series"}
+
+async def build_browse_rows(kids: bool, row_size: int):
+    """Every Browse row for one audience, read from the ranking lists in one query"""
+    if kids:
+        query = {"genre": {"$in": KIDS_GENRES}, "content_type": {"$ne": "*"}}
+    else:
+        query = {"$or": [{"kind": "top_rated"}, {"genre": "*"}]}
+    async with catalog_session(*CONTENT_TYPES) as session:
+        docs = await catalog_db.rankings.find(query, {"items": {"$slice": row_size}}, session=session).to_list(
+            length=None
+        )
+    lists = {doc["_id"]: doc["items"] for doc in docs}
+
+    def ranked(kind: str, content_type: str = "*"):
+        if not kids:
+            return lists.get(ranking_id(kind, content_type), [])
+        # A kids row merges the kids genres' lists
+        content_types = [content_type] if content_type != "*" else list(CONTENT_SCOPES)
+        return top_items(
+            [item for t in content_types for genre in KIDS_GENRES for item in lists.get(ranking_id(kind, t, genre), [])],
+            kind,
+            row_size,
+        )
+
+    rows = [
+        {"key": "top_movies", "title": "Top Rated Movies", "items": ranked("top_rated", "movie")},
+        {"key": "top_series", "title": "Top Rated Series", "items": ranked("top_rated", "series")},
+        {"key": "recently_added", "title": "Recently Added", "items": ranked("newest")},
+        {"key": "most_watchlisted", "title": "Most Watchlisted",
+         "items": [item for item in ranked("most_watchlisted") if item["watchlist_count"] > 0]},
+    ]
+    genre_lists = sorted(
+        key.split(":", 2)[1:] for key in lists
+        if key.startswith("top_rated:") and not key.startswith("top_rated:*:") and not key.endswith(":*")
     )
-    return {"message": "Added to watchlist"}
+    for content_type, genre in genre_lists:
+        rows.append({
+            "key": f"{content_type}:{genre}",
+            "title": f"{genre} {CONTENT_TYPE_LABELS[content_type]}",
+            "items": lists[ranking_id("top_rated", content_type, genre)],
+        })
+
+    rows = [dict(row, items=[project(item, "card") for item in row["items"]]) for row in rows if row["items"]]
+    featured = None
+    if rows:
+        # The hero banner is the only place that needs the detail view
+        async with catalog_session(*CONTENT_TYPES) as session:
+            featured = await catalog_db.content.find_one(
+                {"id": rows[0]["items"][0]["id"]}, PROJECTIONS["detail"], session=session
+            )
+    return {"featured": featured, "rows": rows}
+
+async def get_browse_rows(kids: bool, row_size: int = BROWSE_ROW_SIZE):
+    # Keyed on both catalog versions, so any add makes a fresh entry
+    audience = "kids" if kids else "all"
+    versions = f'{catalog_versions["movies"]["version"]}.{catalog_versions["series"]["version"]}'
+    cache_key = f"browse:{audience}:{row_size}:{versions}"
+    page = await catalog_cache.get(cache_key)
+    if page is None:
+        page = await build_browse_rows(kids, row_size)
+        await catalog_cache.set(cache_key, page)
+    return page
+
+@router.get("/api/browse")
+async def browse(profile_id: Optional[str] = None, row_size: int = BROWSE_ROW_SIZE,
+                 user: dict = Depends(get_user_snapshot)):
+    kids = False
+    if profile_id:
+        kids = find_profile(user, profile_id).get("is_kids", False)
+    return json_response(await get_browse_rows(kids, page_size(row_size)))
+
+# Rankings
+# Materialized top-N lists (see rankings.py). Titles are pushed in as they are
+# added; watchlist changes are batched into the most-watchlisted lists by
+# refresh_rankings(), which also rebuilds every list periodically.
+RANKING_SIZE = max(MAX_PAGE_SIZE, int(os.environ.get("RANKING_SIZE", "100")))
+RANKING_FLUSH_SECONDS = float(os.environ.get("RANKING_FLUSH_SECONDS", "2"))
+RANKING_REBUILD_SECONDS = float(os.environ.get("RANKING_REBUILD_SECONDS", "600"))
+RankingKind = Literal["top_rated", "newest", "most_watchlisted"]
+ContentScope = Literal["movies", "series"]
+
+watchlist_dirty = set()
+
+async def record_watchlist_change(content_id: str, delta: int):
+    await db.content.update_one({"id": content_id}, {"$inc": {"watchlist_count": delta}})
+    watchlist_dirty.add(content_id)
+
+async def refresh_rankings():
+    rebuilt_at = time.monotonic()
+    while True:
+        await asyncio.sleep(RANKING_FLUSH_SECONDS)
+        try:
+            if time.monotonic() - rebuilt_at >= RANKING_REBUILD_SECONDS:
+                watchlist_dirty.clear()
+                await rebuild_rankings(db, CONTENT_SCOPES, VIEW_FIELDS["card"], RANKING_SIZE)
+                rebuilt_at = time.monotonic()
+            elif watchlist_dirty:
+                content_ids = list(watchlist_dirty)
+                watchlist_dirty.clear()
+                docs = await db.content.find(
+                    {"id": {"$in": content_ids}}, ranking_projection(VIEW_FIELDS["card"])
+                ).to_list(length=None)
+                await push_to_rankings(db, docs, ["most_watchlisted"], VIEW_FIELDS["card"], RANKING_SIZE)
+        except Exception:
+            logger.exception("Ranking refresh failed")
+
+@router.get("/api/rankings/{kind}", response_model=List[ContentCard])
+async def get_ranking(kind: RankingKind, content_type: Optional[ContentScope] = None, genre: Optional[str] = None,
+                      limit: int = 20, offset: int = 0):
+    limit = page_size(limit)
+    async with catalog_session(*([content_type] if content_type else CONTENT_TYPES)) as session:
+        doc = await catalog_db.rankings.find_one(
+            {"_id": ranking_id(kind, CONTENT_TYPES[content_type] if content_type else "*", genre or "*")},
+            {"items": {"$slice": [max(0, offset), limit]}},
+            session=session,
+        )
+    return json_response([project(item, "card") for item in (doc or {}).get("items", [])])
 
-@app.delete("/api/watchlist/{profile_id}/{content_id}")
-async def remove_from_watchlist(profile_id: str, content_id: str, user_id: str = Depends(verify_token)):
-    db.users.update_one(
-        {"id": user_id, "profiles.id": profile_id},
-        {"$pull": {"profiles.$.watchlist": content_id}}
+# Recommendations
+# Item-item co-occurrence over every watchlist (see recommend.py), rebuilt in
+# a worker thread every RECOMMENDATIONS_REFRESH_SECONDS. Each worker holds its
+# own copy; a profile is scored against its most recent watchlist entries.
+RECOMMENDATIONS_REFRESH_SECONDS = float(os.environ.get("RECOMMENDATIONS_REFRESH_SECONDS", "900"))
+RECOMMENDATION_NEIGHBOURS = int(os.environ.get("RECOMMENDATION_NEIGHBOURS", "50"))
+RECOMMENDATION_MAX_SEEDS = int(os.environ.get("RECOMMENDATION_MAX_SEEDS", "200"))
+
+recommender = Recommender.empty()
+
+async def refresh_recommender(database):
+    global recommender
+    catalog = [(doc["id"], doc["genre"]) async for doc in database.content.find({}, {"_id": 0, "id": 1, "genre": 1})]
+    pairs = [
+        (doc["profile_id"], doc["content_id"])
+        async for doc in database.watchlist_items.find({}, {"_id": 0, "profile_id": 1, "content_id": 1})
+    ]
+    recommender = await asyncio.to_thread(
+        Recommender.build, catalog, pairs, KIDS_GENRES, RECOMMENDATION_NEIGHBOURS
     )
+
+async def refresh_recommendations():
+    while True:
+        await asyncio.sleep(RECOMMENDATIONS_REFRESH_SECONDS)
+        try:
+            await refresh_recommender(catalog_db)
+        except Exception:
+            logger.exception("Recommendation refresh failed")
+
+@router.get("/api/recommendations/{profile_id}", response_model=List[ContentCard])
+async def get_recommendations(profile_id: str, limit: int = 20, view: View = "card",
+                              user: dict = Depends(get_user_snapshot)):
+    limit = page_size(limit)
+    kids = find_profile(user, profile_id).get("is_kids", False)
+    async with user_session(user["id"]) as session:
+        watched = [
+            item["content_id"]
+            async for item in db.watchlist_items.find(
+                {"profile_id": profile_id}, {"_id": 0, "content_id": 1}, session=session
+            ).sort("added_at", DESCENDING).limit(RECOMMENDATION_MAX_SEEDS)
+        ]
+    with span("recommendations.score", seeds=len(watched)):
+        ids = recommender.recommend(watched, limit, kids)
+
+    content = {}
+    if ids:
+        async for doc in catalog_db.content.find({"id": {"$in": ids}}, PROJECTIONS[view]):
+            content[doc["id"]] = doc
+    return json_response([content[content_id] for content_id in ids if content_id in content])
+
+# Search endpoints
+@router.get("/api/search", response_model=List[ContentCard])
+async def search_content(q: str, content_type: Optional[str] = None, limit: int = 20,
+                         offset: int = 0, cursor: Optional[str] = None, view: View = "card"):
+    limit = page_size(limit)
+    after, served = None, max(0, offset)
+    if cursor:
+        score, rating, last_id, served = decode_cursor(cursor, "s", "r", "i", "n")
+        after = (score, rating, last_id)
+
+    with span("search.ranked", query=q):
+        ranked = search_index.ranked(
+            q,
+            content_type=CONTENT_TYPES.get(content_type),
+            limit=limit + 1,
+            offset=0 if after else served,
+            after=after,
+            depth=max(search_index.candidate_depth, 10 * (served + limit)),
+        )
+
+    next_cursor = None
+    if len(ranked) > limit:
+        ranked = ranked[:limit]
+        score, rating, last_id = ranked[-1][0]
+        next_cursor = encode_cursor({"s": score, "r": rating, "i": last_id, "n": served + limit})
+    return json_response([project(doc, view) for _, doc in ranked], next_cursor)
+
+@router.get("/api/search/suggest")
+async def search_suggest(q: str, content_type: Optional[str] = None, limit: int = 10):
+    limit = page_size(limit)
+    return search_index.suggest(q, content_type=CONTENT_TYPES.get(content_type), limit=limit)
+
+# Watchlist endpoints
+# One watchlist_items row per (profile, title); the profile's owner is checked
+# against the cached user snapshot, so writes touch only that row.
+async def resolve_content_type(content_id: str):
+    doc = search_index.docs.get(content_id)
+    if doc:
+        return doc["content_type"]
+    doc = await catalog_db.content.find_one({"id": content_id}, {"_id": 0, "content_type": 1})
+    if doc:
+        return doc["content_type"]
+    raise HTTPException(status_code=404, detail="Content not found")
+
+@router.post("/api/watchlist/{profile_id}/{content_id}")
+async def add_to_watchlist(profile_id: str, content_id: str, user: dict = Depends(get_user_snapshot)):
+    find_profile(user, profile_id)
+    content_type = await resolve_content_type(content_id)
+    async with user_session(user["id"], writes=True) as session:
+        result = await db.watchlist_items.update_one(
+            {"profile_id": profile_id, "content_id": content_id},
+            {"$setOnInsert": {"content_type": content_type, "added_at": datetime.utcnow()}},
+            upsert=True,
+            session=session,
+        )
+    if result.upserted_id is not None:
+        await record_watchlist_change(content_id, 1)
+        emit_watchlist_change("watchlist.added", profile_id, content_id)
+    return {"message": "Added to watchlist"}
+
+@router.delete("/api/watchlist/{profile_id}/{content_id}")
+async def remove_from_watchlist(profile_id: str, content_id: str, user: dict = Depends(get_user_snapshot)):
+    find_profile(user, profile_id)
+    async with user_session(user["id"], writes=True) as session:
+        result = await db.watchlist_items.delete_one(
+            {"profile_id": profile_id, "content_id": content_id}, session=session
+        )
+    if result.deleted_count:
+        await record_watchlist_change(content_id, -1)
+        emit_watchlist_change("watchlist.removed", profile_id, content_id)
     return {"message": "Removed from watchlist"}
 
-@app.get("/api/watchlist/{profile_id}")
-async def get_watchlist(profile_id: str, user_id: str = Depends(verify_token)):
-    user = db.users.find_one({"id": user_id})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    profile = next((p for p in user.get("profiles", []) if p["id"] == profile_id), None)
-    if not profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
+@router.get("/api/watchlist/{profile_id}", response_model=List[ContentCard])
+async def get_watchlist(profile_id: str, limit: int = MAX_PAGE_SIZE, cursor: Optional[str] = None,
+                        view: View = "card", user: dict = Depends(get_user_snapshot)):
+    limit = page_size(limit)
+    find_profile(user, profile_id)
     
-    watchlist_ids = profile.get("watchlist", [])
+    # Most recently added first, seeking past the last (added_at, content_id)
+    query = {"profile_id": profile_id}
+    if cursor:
+        added_at, last_id = decode_cursor(cursor, "a", "c")
+        try:
+            added_at = datetime.fromisoformat(added_at)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query["$or"] = [
+            {"added_at": {"$lt": added_at}},
+            {"added_at": added_at, "content_id": {"$lt": last_id}},
+        ]
     
-    # Get movies and series from watchlist
-    movies = list(db.movies.find({"id": {"$in": watchlist_ids}}))
-    series = list(db.series.find({"id": {"$in": watchlist_ids}}))
+    async with user_session(user["id"]) as session:
+        items = await db.watchlist_items.find(query, {"_id": 0}, session=session).sort(
+            [("added_at", DESCENDING), ("content_id", DESCENDING)]
+        ).limit(limit + 1).to_list(length=limit + 1)
     
-    for movie in movies:
-        movie["_id"] = str(movie["_id"])
-        movie["content_type"] = "movie"
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor({"a": items[-1]["added_at"].isoformat(), "c": items[-1]["content_id"]})
     
-    for serie in series:
-        serie["_id"] = str(serie["_id"])
-        serie["content_type"] = "series"
+    content = {}
+    if items:
+        ids = [item["content_id"] for item in items]
+        async for doc in catalog_db.content.find({"id": {"$in": ids}}, PROJECTIONS[view]):
+            content[doc["id"]] = doc
     
-    return movies + series
+    return json_response(
+        [content[item["content_id"]] for item in items if item["content_id"] in content],
+        next_cursor,
+    )
+
+# Playback progress
+# Player heartbeats are buffered per worker and written behind in unordered
+# bulk upserts (see progress.py): every PROGRESS_FLUSH_SECONDS, as soon as
+# PROGRESS_FLUSH_BATCH titles are waiting, and on shutdown. Heartbeats are
+# refused with a 503 while PROGRESS_BUFFER_MAX_ENTRIES are waiting, i.e.
+# when Mongo cannot keep up. A title counts as watched once the position
+# passes PROGRESS_FINISHED_RATIO of its duration.
+PROGRESS_FLUSH_SECONDS = float(os.environ.get("PROGRESS_FLUSH_SECONDS", "5"))
+PROGRESS_FLUSH_BATCH = int(os.environ.get("PROGRESS_FLUSH_BATCH", "1000"))
+PROGRESS_BUFFER_MAX_ENTRIES = int(os.environ.get("PROGRESS_BUFFER_MAX_ENTRIES", "200000"))
+PROGRESS_FINISHED_RATIO = float(os.environ.get("PROGRESS_FINISHED_RATIO", "0.95"))
+PROGRESS_RETRY_AFTER = int(os.environ.get("PROGRESS_RETRY_AFTER", "5"))
+
+progress_buffer = ProgressBuffer(finished_ratio=PROGRESS_FINISHED_RATIO, batch_size=PROGRESS_FLUSH_BATCH)
+progress_flush_seconds = metrics.histogram("playback_progress_flush_seconds", "Write-behind flush duration")
+
+class ProgressHeartbeat(BaseModel):
+    profile_id: str
+    content_id: str
+    position: float = Field(..., ge=0)  # seconds
+    duration: float = Field(..., gt=0)  # seconds
+
+class ContinueWatchingItem(ContentCard):
+    position: float
+    progress_duration: float
+    updated_at: datetime
+
+async def write_progress():
+    progress_buffer.full = asyncio.Event()  # on this lifespan's loop
+    while True:
+        try:
+            await asyncio.wait_for(progress_buffer.full.wait(), PROGRESS_FLUSH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        started = time.perf_counter()
+        try:
+            await progress_buffer.flush(db.playback_progress)
+        except Exception:
+            logger.exception("Playback progress flush failed")
+            await asyncio.sleep(PROGRESS_FLUSH_SECONDS)
+        progress_flush_seconds.observe(time.perf_counter() - started)
+
+@router.post("/api/progress", status_code=status.HTTP_204_NO_CONTENT)
+async def record_progress(heartbeat: ProgressHeartbeat, user: dict = Depends(get_user_snapshot)):
+    find_profile(user, heartbeat.profile_id)
+    if heartbeat.content_id not in search_index.docs:
+        await resolve_content_type(heartbeat.content_id)
+    if len(progress_buffer) >= PROGRESS_BUFFER_MAX_ENTRIES:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Progress is not being saved right now, please retry",
+            headers={"Retry-After": str(PROGRESS_RETRY_AFTER)},
+        )
+    progress_buffer.record(
+        heartbeat.profile_id, heartbeat.content_id,
+        min(heartbeat.position, heartbeat.duration), heartbeat.duration, datetime.utcnow(),
+    )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/api/continue-watching/{profile_id}", response_model=List[ContinueWatchingItem])
+async def get_continue_watching(profile_id: str, limit: int = 20, user: dict = Depends(get_user_snapshot)):
+    limit = page_size(limit)
+    find_profile(user, profile_id)
+    # Buffered entries may mark stored ones as finished, so read enough to fill the page regardless
+    stored_limit = limit + len(progress_buffer.pending(profile_id))
+    async with user_session(user["id"]) as session:
+        stored = await db.playback_progress.find(
+            {"profile_id": profile_id, "finished": False}, {"_id": 0, "profile_id": 0}, session=session
+        ).sort("updated_at", DESCENDING).limit(stored_limit).to_list(length=stored_limit)
+    items = progress_buffer.merge(profile_id, stored, limit)
+
+    content = {}
+    if items:
+        ids = [item["content_id"] for item in items]
+        async for doc in catalog_db.content.find({"id": {"$in": ids}}, PROJECTIONS["card"]):
+            content[doc["id"]] = doc
+    return json_response([
+        {
+            **content[item["content_id"]],
+            "position": item["position"],
+            "progress_duration": item["duration"],
+            "updated_at": item["updated_at"],
+        }
+        for item in items if item["content_id"] in content
+    ])
+
+# Event stream
+# Server-sent events for new titles and for one profile's watchlist changes,
+# so clients can stop polling. A single worker publishes from the endpoints;
+# with EVENTS_FROM_CHANGE_STREAMS every worker tails Mongo change streams
+# instead (replica set required; watchlist removals need MongoDB 6.0+
+# pre-images) and the endpoints publish nothing themselves.
+EVENTS_FROM_CHANGE_STREAMS = os.environ.get("EVENTS_FROM_CHANGE_STREAMS", "false").lower() == "true"
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_QUEUE_SIZE = int(os.environ.get("EVENTS_QUEUE_SIZE", "100"))
+EVENTS_HISTORY = int(os.environ.get("EVENTS_HISTORY", "1000"))
+EVENTS_MAX_SUBSCRIBERS = int(os.environ.get("EVENTS_MAX_SUBSCRIBERS", "10000"))
+# EventSource cannot send an Authorization header, so browsers open streams
+# with a short-lived token in the query string instead
+EVENTS_TOKEN_TTL_SECONDS = int(os.environ.get("EVENTS_TOKEN_TTL_SECONDS", "60"))
+
+# Created by each worker's lifespan: event ids carry the bus's random instance
+# id, which must differ between workers forked from one preloaded master
+event_bus = None
+
+def create_event_bus():
+    return EventBus(history=EVENTS_HISTORY, queue_size=EVENTS_QUEUE_SIZE, max_subscribers=EVENTS_MAX_SUBSCRIBERS)
+
+def publish_title_added(doc: dict):
+    event_bus.publish("catalog", "title.added", project(doc, "card"))
+
+def publish_watchlist_change(type: str, profile_id: str, content_id: str):
+    event_bus.publish(f"profile:{profile_id}", type, {"profile_id": profile_id, "content_id": content_id})
+
+def emit_title_added(doc: dict):
+    if not EVENTS_FROM_CHANGE_STREAMS:
+        publish_title_added(doc)
+
+def emit_watchlist_change(type: str, profile_id: str, content_id: str):
+    if not EVENTS_FROM_CHANGE_STREAMS:
+        publish_watchlist_change(type, profile_id, content_id)
+
+def on_content_change(change):
+    publish_title_added(change["fullDocument"])
+
+def on_watchlist_change(change):
+    if change["operationType"] == "insert":
+        item = change["fullDocument"]
+        publish_watchlist_change("watchlist.added", item["profile_id"], item["content_id"])
+    elif change.get("fullDocumentBeforeChange"):
+        item = change["fullDocumentBeforeChange"]
+        publish_watchlist_change("watchlist.removed", item["profile_id"], item["content_id"])
+
+async def start_change_feeds(database):
+    try:
+        await database.command({"collMod": "watchlist_items", "changeStreamPreAndPostImages": {"enabled": True}})
+    except PyMongoError:
+        logger.warning("Could not enable pre-images on watchlist_items; removals will not be streamed")
+    return [
+        asyncio.create_task(follow_changes(
+            database.content, [{"$match": {"operationType": "insert"}}], on_content_change,
+        )),
+        asyncio.create_task(follow_changes(
+            database.watchlist_items, [{"$match": {"operationType": {"$in": ["insert", "delete"]}}}],
+            on_watchlist_change, full_document_before_change="whenAvailable",
+        )),
+    ]
+
+optional_security = HTTPBearer(auto_error=False)
+
+async def verify_events_token(token: Optional[str] = None,
+                              credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """The caller of an event stream, from a ?token= issued by /api/events/token or a bearer token"""
+    if token is None:
+        if credentials is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return await verify_token(credentials)
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
+        payload = {}
+    if payload.get("scope") != "events" or payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid event stream token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload["sub"]
+
+@router.post("/api/events/token")
+async def create_events_token(user_id: str = Depends(verify_token)):
+    token = create_access_token(
+        {"sub": user_id, "scope": "events"}, timedelta(seconds=EVENTS_TOKEN_TTL_SECONDS)
+    )
+    return {"token": token, "expires_in": EVENTS_TOKEN_TTL_SECONDS}
+
+@router.get("/api/events")
+async def stream_events(request: Request, profile_id: Optional[str] = None, last_event_id: Optional[str] = None,
+                        user_id: str = Depends(verify_events_token)):
+    """The token is checked once, when the stream opens; a reconnect needs a fresh one.
+    last_event_id stands in for the Last-Event-ID header when the client reconnects with a new EventSource."""
+    user = await get_user_snapshot(user_id)
+    topics = ["catalog"]
+    kids = False
+    if profile_id:
+        kids = find_profile(user, profile_id).get("is_kids", False)
+        topics.append(f"profile:{profile_id}")
+    try:
+        subscription = event_bus.subscribe(topics, request.headers.get("last-event-id") or last_event_id)
+    except SubscribersExhausted:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many event streams",
+            headers={"Retry-After": str(int(EVENTS_HEARTBEAT_SECONDS))},
+        )
+
+    async def frames():
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                event = await subscription.next(EVENTS_HEARTBEAT_SECONDS)
+                if event is None:
+                    # Keeps proxies from timing the stream out and surfaces dead connections
+                    yield b": heartbeat\n\n"
+                elif not (kids and event.type == "title.added" and event.data["genre"] not in KIDS_GENRES):
+                    yield event.encode()
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # Health check
-@app.get("/api/health")
+@router.get("/api/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.environ.get("HEALTH_CHECK_TIMEOUT_SECONDS", "2"))
+
+@router.get("/api/health/deep")
+async def deep_health_check():
+    """Round-trips to Mongo; answers 503 when the database is unreachable"""
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(client.admin.command("ping"), HEALTH_CHECK_TIMEOUT_SECONDS)
+        database = {"status": "ok"}
+    except (PyMongoError, asyncio.TimeoutError) as exc:
+        database = {"status": "error", "error": str(exc) or type(exc).__name__}
+    database["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    healthy = database["status"] == "ok"
+    return TracedResponse(
+        {
+            "status": "healthy" if healthy else "unhealthy",
+            "timestamp": datetime.utcnow(),
+            "database": database,
+            "search_index_documents": len(search_index),
+            "password_hash_queue_depth": hash_stats["pending"],
+            "catalog_versions": {scope: meta["version"] for scope, meta in catalog_versions.items()},
+        },
+        status_code=status.HTTP_200_OK if healthy else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+@router.get("/api/metrics")
+async def get_metrics():
+    return {
+        "password_hashing": password_hash_metrics(),
+        "catalog_cache": catalog_cache.info(),
+        "token_cache": token_cache.info(),
+        "user_cache": user_cache.info(),
+        "encoded_cache": encoded_cache.info(),
+        "rate_limiter": rate_limiter.info(),
+        "recommendations": recommender.info(),
+        "events": event_bus.info(),
+        "playback_progress": progress_buffer.info(),
+    }
+
+cache_hits = metrics.counter("cache_hits_total", "Cache hits", ("cache",))
+cache_misses = metrics.counter("cache_misses_total", "Cache misses", ("cache",))
+cache_evictions = metrics.counter("cache_evictions_total", "Entries evicted to stay under max_entries", ("cache",))
+cache_hit_ratio = metrics.gauge("cache_hit_ratio", "Hits over lookups since start", ("cache",))
+cache_entries = metrics.gauge("cache_entries", "Entries held by in-process caches", ("cache",))
+hash_queue_depth = metrics.gauge("password_hash_queue_depth", "bcrypt jobs queued or running")
+search_documents = metrics.gauge("search_index_documents", "Titles in the in-process search index")
+event_subscriptions = metrics.gauge("event_stream_subscriptions", "Open server-sent event streams")
+event_overflows = metrics.counter("event_stream_overflows_total", "Streams that fell behind and were told to resync")
+progress_buffered = metrics.gauge("playback_progress_buffered", "Titles with progress waiting to be written")
+progress_heartbeats = metrics.counter("playback_progress_heartbeats_total", "Player heartbeats received")
+progress_written = metrics.counter("playback_progress_written_total", "Progress entries written to Mongo")
+
+@metrics.collector
+def collect_runtime_metrics():
+    for name, cache in (("catalog", catalog_cache), ("token", token_cache), ("user", user_cache),
+                        ("encoded", encoded_cache)):
+        if cache is None:
+            continue
+        info = cache.info()
+        cache_hits.set(info["hits"], cache=name)
+        cache_misses.set(info["misses"], cache=name)
+        cache_evictions.set(info["evictions"], cache=name)
+        cache_hit_ratio.set(info["hit_ratio"], cache=name)
+        if "entries" in info:
+            cache_entries.set(info["entries"], cache=name)
+    hash_queue_depth.set(hash_stats["pending"])
+    search_documents.set(len(search_index))
+    event_subscriptions.set(event_bus.subscriptions)
+    event_overflows.set(event_bus.overflows)
+    progress_buffered.set(len(progress_buffer))
+    progress_heartbeats.set(progress_buffer.heartbeats)
+    progress_written.set(progress_buffer.written)
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# App factory. Building the app only wires routes and middleware; the Mongo
+# client, caches and pools are created per process by lifespan(), so a
+# preloading server (see gunicorn.conf.py) can import this module once and
+# fork workers from it.
+def create_app() -> FastAPI:
+    app = FastAPI(
+        title="Netflix Clone API",
+        version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=TracedResponse,
+    )
+    # Each one added wraps the ones before it
+    if COMPRESSION_ENABLED:
+        # Inside conditional_get, which looks up encoded_cache before any handler runs
+        app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES, cache=encoded_cache)
+    for middleware in (conditional_get, rate_limit, record_request_metrics, trace_requests):
+        app.middleware("http")(middleware)
+    # Outermost, so 304s and 429s answered by the middleware above carry CORS headers too
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["ETag", "Last-Modified", "Cache-Control", "X-Next-Cursor", "Retry-After"],
+    )
+    app.include_router(router)
+    return app
+
+app = create_app()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark
+Times, in fresh interpreters, how long importing server.py takes and how
+long a process needs from start to ready (create_app() plus lifespan
+startup: Mongo client, indexes, rankings, recommender, search index), and
+reports the median over --runs.
+
+With --gunicorn it also starts the production entry point (gunicorn.conf.py)
+with and without preload_app and reports the time until /api/health first
+answers, the time until every worker has finished startup, and RSS/PSS of
+the master and each worker. That mode needs a reachable MONGO_URL; the
+in-process timings can use --mongomock instead.
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+CHILD_IMPORT = """
+import time
+started = time.perf_counter()
+import server
+print(time.perf_counter() - started)
+"""
+
+CHILD_READY = """
+import asyncio, time
+started = time.perf_counter()
+import server
+if {mongomock}:
+    from mongomock_motor import AsyncMongoMockClient
+    server.create_mongo_client = AsyncMongoMockClient
+    server.CAUSAL_CATALOG_READS = False
+server.MONGO_DB_NAME = {database!r}
+
+async def ready():
+    app = server.create_app()
+    async with server.lifespan(app):
+        return time.perf_counter() - started
+
+print(asyncio.run(ready()))
+"""
+
+def time_child(source: str, runs: int):
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", source], cwd=HERE, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise SystemExit(f"❌ Child process failed:\n{result.stderr}")
+        samples.append(float(result.stdout.strip().splitlines()[-1]) * 1000)
+    return {"median_ms": round(statistics.median(samples), 1), "min_ms": round(min(samples), 1),
+            "max_ms": round(max(samples), 1)}
+
+def memory(pid: int):
+    """RSS and PSS in MiB from /proc/<pid>/smaps_rollup (Linux)"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower() + "_mib"] = round(int(rest.split()[0]) / 1024, 1)
+    return values
+
+def children(pid: int):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+def run_gunicorn(args, preload: bool):
+    port = args.port
+    env = dict(os.environ, WEB_CONCURRENCY=str(args.workers), BIND=f"127.0.0.1:{port}",
+               PRELOAD_APP="true" if preload else "false")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "server:create_app()"],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    os.set_blocking(process.stderr.fileno(), False)
+    log = ""
+    first_healthy = None
+    all_ready = None
+    try:
+        deadline = started + args.timeout
+        while all_ready is None and time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise SystemExit(f"❌ gunicorn exited:\n{log}{process.stderr.read() or ''}")
+            log += process.stderr.read() or ""
+            if first_healthy is None:
+                try:
+                    if httpx.get(f"http://127.0.0.1:{port}/api/health", timeout=0.5).status_code == 200:
+                        first_healthy = time.perf_counter() - started
+                except httpx.HTTPError:
+                    pass
+            if len(re.findall(r"Application startup complete", log)) >= args.workers:
+                all_ready = time.perf_counter() - started
+            time.sleep(0.02)
+        if all_ready is None:
+            raise SystemExit(f"❌ Workers not ready within {args.timeout}s:\n{log}")
+        time.sleep(args.settle)
+        workers = [memory(pid) for pid in children(process.pid)]
+        return {
+            "preload": preload,
+            "first_healthy_ms": round(first_healthy * 1000, 1) if first_healthy else None,
+            "all_workers_ready_ms": round(all_ready * 1000, 1),
+            "master": memory(process.pid),
+            "workers": workers,
+            "workers_pss_total_mib": round(sum(worker["pss_mib"] for worker in workers), 1),
+        }
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=args.timeout)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mongomock", action="store_true", help="time lifespan startup on an in-memory Mongo stand-in")
+    parser.add_argument("--database", default="netflix_clone_bench", help="database the started app points at")
+    parser.add_argument("--gunicorn", action="store_true", help="also start gunicorn with and without preload")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds to wait before reading worker memory")
+    parser.add_argument("--budget-ms", type=float, help="fail when the median time to ready exceeds this")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {
+        "import": time_child(CHILD_IMPORT, args.runs),
+        "ready": time_child(CHILD_READY.format(mongomock=args.mongomock, database=args.database), args.runs),
+        "target": "mongomock" if args.mongomock else os.environ.get("MONGO_URL", "default MONGO_URL"),
+    }
+    if args.gunicorn:
+        results["gunicorn"] = [run_gunicorn(args, preload) for preload in (True, False)]
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.budget_ms is not None:
+        if results["ready"]["median_ms"] > args.budget_ms:
+            print(f"⚠️  Median time to ready {results['ready']['median_ms']}ms exceeds the {args.budget_ms}ms budget")
+            return 1
+        print(f"✅ Median time to ready within the {args.budget_ms}ms budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import pytest
+
+from cache import MemoryCache, RedisCache
+
+async def test_get_set_and_stats():
+    cache = MemoryCache()
+    assert await cache.get("movies:doc:1") is None
+    await cache.set("movies:doc:1", {"id": "1"})
+    assert await cache.get("movies:doc:1") == {"id": "1"}
+    info = cache.info()
+    assert (info["hits"], info["misses"], info["hit_ratio"]) == (1, 1, 0.5)
+
+async def test_get_many_counts_each_key():
+    cache = MemoryCache()
+    await cache.set("movies:doc:1", {"id": "1"})
+    assert await cache.get_many(["movies:doc:1", "movies:doc:2"]) == [{"id": "1"}, None]
+    cache.record_miss(2)
+    assert (cache.stats.hits, cache.stats.misses) == (1, 3)
+
+async def test_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.get("a")
+    await cache.set("c", 3)
+    assert [await cache.get(key) for key in "abc"] == [1, None, 3]
+    assert cache.stats.evictions == 1
+
+async def test_expired_entries_miss(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("cache.time.monotonic", lambda: now[0])
+    cache = MemoryCache(ttl=30)
+    await cache.set("a", 1)
+    now[0] += 29
+    assert await cache.get("a") == 1
+    now[0] += 2
+    assert await cache.get("a") is None
+    assert cache.stats.expirations == 1
+    assert "a" not in cache.entries
+
+async def test_invalidate_by_prefix():
+    cache = MemoryCache()
+    for key in ("movies:list:1", "movies:doc:1", "series:doc:1"):
+        await cache.set(key, key)
+    await cache.invalidate("movies:")
+    assert list(cache.entries) == ["series:doc:1"]
+    assert cache.stats.invalidations == 2
+
+async def test_delete_counts_only_present_keys():
+    cache = MemoryCache()
+    await cache.set("movies:doc:1", 1)
+    await cache.delete("movies:doc:1")
+    await cache.delete("movies:doc:1")
+    assert cache.entries == {}
+    assert cache.stats.invalidations == 1
+
+async def test_redis_cache_round_trips_bson_values():
+    fakeredis = pytest.importorskip("fakeredis")
+    cache = RedisCache(fakeredis.FakeAsyncRedis(), ttl=30)
+    doc = {"id": "1", "added_at": datetime(2024, 1, 2, 3, 4, 5)}
+    await cache.set("movies:doc:1", doc)
+    await cache.set("series:doc:1", {"id": "1"})
+    assert await cache.get("movies:doc:1") == doc
+    await cache.invalidate("movies:")
+    assert await cache.get("movies:doc:1") is None
+    assert await cache.get("series:doc:1") == {"id": "1"}
+    assert cache.stats.invalidations == 1
+
+async def test_redis_get_many_counts_each_key():
+    fakeredis = pytest.importorskip("fakeredis")
+    cache = RedisCache(fakeredis.FakeAsyncRedis(), ttl=30)
+    await cache.set("movies:doc:1", {"id": "1"})
+    assert await cache.get_many(["movies:doc:1", "movies:doc:2"]) == [{"id": "1"}, None]
+    assert await cache.get_many([]) == []
+    cache.record_miss(2)
+    assert (cache.stats.hits, cache.stats.misses) == (1, 3)
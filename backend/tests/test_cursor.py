@@ -0,0 +1,39 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from server import decode_cursor, encode_cursor
+
+def raw_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+def test_round_trip():
+    cursor = encode_cursor({"r": 8.5, "i": "65a1f0c2e4b0a1b2c3d4e5f6"})
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "r", "i") == [8.5, "65a1f0c2e4b0a1b2c3d4e5f6"]
+
+def test_fields_come_back_in_the_order_asked():
+    cursor = encode_cursor({"s": 1.25, "r": 7, "i": "m1", "n": 20})
+    assert decode_cursor(cursor, "n", "s", "r", "i") == [20, 1.25, 7, "m1"]
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    raw_cursor([1, 2]),
+    raw_cursor({"r": 1.0}),
+    raw_cursor({"r": "x", "i": "m1"}),
+    raw_cursor({"r": True, "i": "m1"}),
+    raw_cursor({"r": 1.0, "i": 5}),
+    raw_cursor({"r": None, "i": "m1"}),
+])
+def test_malformed_cursors_are_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, "r", "i")
+    assert exc.value.status_code == 400
+
+@pytest.mark.parametrize("served", [1.5, -1, "20"])
+def test_served_count_must_be_a_non_negative_int(served):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(raw_cursor({"s": 1.0, "n": served}), "s", "n")
+    assert exc.value.status_code == 400
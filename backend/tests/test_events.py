@@ -0,0 +1,32 @@
+from events import EventBus
+
+def event_types(subscription):
+    types = []
+    while not subscription.queue.empty():
+        types.append(subscription.queue.get_nowait().type)
+    return types
+
+async def test_replays_missed_events_on_the_same_bus():
+    bus = EventBus()
+    seen = bus.publish("catalog", "title.added", {})
+    bus.publish("catalog", "title.added", {})
+    bus.publish("profile:p1", "watchlist.added", {})
+    assert event_types(bus.subscribe(["catalog"], seen.id)) == ["title.added"]
+
+async def test_another_bus_ids_get_a_resync():
+    # What a client reconnecting to a different worker sends
+    other = EventBus()
+    other.publish("catalog", "title.added", {})
+    other.publish("catalog", "title.added", {})
+    bus = EventBus()
+    for _ in range(3):
+        bus.publish("catalog", "title.added", {})
+    assert bus.instance != other.instance
+    assert event_types(bus.subscribe(["catalog"], f"{other.instance}-1")) == ["resync"]
+
+async def test_ids_older_than_the_history_get_a_resync():
+    bus = EventBus(history=2)
+    first = bus.publish("catalog", "title.added", {})
+    for _ in range(3):
+        bus.publish("catalog", "title.added", {})
+    assert event_types(bus.subscribe(["catalog"], first.id)) == ["resync"]
@@ -0,0 +1,37 @@
+"""Explain-plan checks for the queries in check_indexes.QUERY_PLANS; need a real mongod (TEST_MONGO_URL)"""
+
+import os
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from check_indexes import QUERY_PLANS, plan_stages
+from server import INDEXES, MONGO_URL
+
+TEST_MONGO_URL = os.environ.get("TEST_MONGO_URL", MONGO_URL)
+TEST_DATABASE = "netflix_clone_test_indexes"
+
+@pytest.fixture(scope="module")
+def db():
+    client = MongoClient(TEST_MONGO_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"no mongod reachable at {TEST_MONGO_URL}")
+    client.drop_database(TEST_DATABASE)
+    database = client[TEST_DATABASE]
+    for collection, indexes in INDEXES.items():
+        database[collection].create_indexes(indexes)
+    yield database
+    client.drop_database(TEST_DATABASE)
+    client.close()
+
+@pytest.mark.parametrize("collection, query, expected", QUERY_PLANS,
+                         ids=[f"{collection}-{sorted(query)}" for collection, query, _ in QUERY_PLANS])
+def test_query_uses_an_index(db, collection, query, expected):
+    explain = db[collection].find(query).explain()
+    stages = list(plan_stages(explain["queryPlanner"]["winningPlan"]))
+    assert "COLLSCAN" not in [stage for stage, _ in stages]
+    assert {name for stage, name in stages if stage == "IXSCAN"} & set(expected)
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import pytest
+
+from migrate_profiles import migrate_user
+
+@pytest.fixture
+def db():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    return mongomock_motor.AsyncMongoMockClient()["netflix_clone_test"]
+
+async def test_profiles_without_created_at_get_a_timestamp(db):
+    user = {"id": "u1", "profiles": [{"id": "p1", "name": "Legacy", "watchlist": ["m1", "gone"]}]}
+    await db.users.insert_one(dict(user))
+    await db.movies.insert_one({"id": "m1", "title": "Old"})
+    started = datetime.utcnow().replace(microsecond=0)  # stored datetimes keep milliseconds only
+
+    assert await migrate_user(db, user) == (1, 2)
+
+    items = await db.watchlist_items.find({"profile_id": "p1"}).to_list(length=None)
+    assert {item["content_id"]: item["content_type"] for item in items} == {"m1": "movie", "gone": None}
+    assert all(item["added_at"] >= started for item in items)
+    assert (await db.profiles.find_one({"id": "p1"}))["created_at"] >= started
+    assert "profiles" not in await db.users.find_one({"id": "u1"})
+
+async def test_created_at_is_kept_when_present(db):
+    created_at = datetime(2023, 5, 1)
+    user = {"id": "u1", "profiles": [{"id": "p1", "name": "P", "created_at": created_at, "watchlist": ["m1"]}]}
+    await db.users.insert_one(dict(user))
+    await migrate_user(db, user)
+    assert (await db.watchlist_items.find_one({"content_id": "m1"}))["added_at"] == created_at
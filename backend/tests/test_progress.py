@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from progress import DUPLICATE_KEY, ProgressBuffer
+
+T0 = datetime(2024, 1, 1)
+
+class RecordingCollection:
+    """Collects bulk_write batches; fail(batch_number, ops) may raise instead"""
+
+    def __init__(self, fail=None):
+        self.batches = []
+        self.fail = fail
+
+    async def bulk_write(self, ops, ordered=True):
+        assert not ordered
+        if self.fail is not None:
+            self.fail(len(self.batches), ops)
+        self.batches.append(ops)
+
+def test_record_coalesces_per_title():
+    buffer = ProgressBuffer(batch_size=3)
+    buffer.record("p1", "m1", 10, 100, T0)
+    buffer.record("p1", "m1", 20, 100, T0 + timedelta(seconds=10))
+    buffer.record("p2", "m1", 5, 100, T0)
+    assert len(buffer) == 2
+    assert buffer.coalesced == 1
+    assert buffer.pending("p1") == {"m1": (20, 100, T0 + timedelta(seconds=10))}
+    assert not buffer.full.is_set()
+    buffer.record("p2", "m2", 5, 100, T0)
+    assert buffer.full.is_set()
+
+async def test_flush_writes_one_conditional_upsert_per_title():
+    buffer = ProgressBuffer(batch_size=2)
+    for content_id in ("m1", "m2", "m3"):
+        buffer.record("p1", content_id, 96, 100, T0)
+    collection = RecordingCollection()
+    assert await buffer.flush(collection) == 3
+    assert [len(batch) for batch in collection.batches] == [2, 1]
+    assert collection.batches[0][0] == UpdateOne(
+        {"profile_id": "p1", "content_id": "m1", "updated_at": {"$lt": T0}},
+        {"$set": {"position": 96, "duration": 100, "finished": True, "updated_at": T0}},
+        upsert=True,
+    )
+    assert len(buffer) == 0 and buffer.pending("p1") == {}
+    assert await buffer.flush(collection) == 0
+
+async def test_failed_writes_are_requeued_but_stale_ones_dropped():
+    def fail(batch_number, ops):
+        raise BulkWriteError({"writeErrors": [
+            {"index": 0, "code": DUPLICATE_KEY, "errmsg": "newer position stored"},
+            {"index": 1, "code": 91, "errmsg": "shutting down"},
+        ]})
+
+    buffer = ProgressBuffer()
+    buffer.record("p1", "m1", 10, 100, T0)
+    buffer.record("p1", "m2", 20, 100, T0)
+    buffer.record("p1", "m3", 30, 100, T0)
+    assert await buffer.flush(RecordingCollection(fail)) == 1
+    assert (buffer.stale, buffer.requeued) == (1, 1)
+    assert buffer.pending("p1") == {"m2": (20, 100, T0)}
+
+async def test_requeue_keeps_a_newer_heartbeat():
+    def fail(batch_number, ops):
+        # A heartbeat lands while the flush is in flight, then the write fails
+        buffer.record("p1", "m1", 50, 100, T0 + timedelta(seconds=40))
+        raise BulkWriteError({"writeErrors": [{"index": 0, "code": 91, "errmsg": "shutting down"}]})
+
+    buffer = ProgressBuffer()
+    buffer.record("p1", "m1", 10, 100, T0)
+    await buffer.flush(RecordingCollection(fail))
+    assert buffer.pending("p1") == {"m1": (50, 100, T0 + timedelta(seconds=40))}
+    assert buffer.requeued == 0
+
+async def test_cancelled_flush_requeues_unwritten_batches():
+    def fail(batch_number, ops):
+        if batch_number == 1:
+            raise asyncio.CancelledError
+
+    buffer = ProgressBuffer(batch_size=2)
+    for content_id in ("m1", "m2", "m3", "m4"):
+        buffer.record("p1", content_id, 10, 100, T0)
+    collection = RecordingCollection(fail)
+    with pytest.raises(asyncio.CancelledError):
+        await buffer.flush(collection)
+    assert len(collection.batches) == 1
+    assert set(buffer.pending("p1")) == {"m3", "m4"}
+    assert buffer.written == 2
+
+def test_merge_prefers_newer_buffered_positions():
+    buffer = ProgressBuffer()
+    stored = [
+        {"content_id": "m1", "position": 10, "duration": 100, "finished": False, "updated_at": T0},
+        {"content_id": "m2", "position": 30, "duration": 100, "finished": False, "updated_at": T0 + timedelta(minutes=5)},
+        {"content_id": "m3", "position": 20, "duration": 100, "finished": False, "updated_at": T0},
+    ]
+    buffer.record("p1", "m1", 40, 100, T0 + timedelta(minutes=10))
+    buffer.record("p1", "m2", 5, 100, T0)
+    buffer.record("p1", "m3", 99, 100, T0 + timedelta(minutes=1))
+    merged = buffer.merge("p1", stored, limit=10)
+    assert [(item["content_id"], item["position"]) for item in merged] == [("m1", 40), ("m2", 30)]
+    assert len(buffer.merge("p1", stored, limit=1)) == 1
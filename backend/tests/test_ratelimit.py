@@ -0,0 +1,63 @@
+import pytest
+
+from ratelimit import MemoryBuckets, RedisBuckets
+
+async def test_memory_bucket_drains_and_refills(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("ratelimit.time.monotonic", lambda: now[0])
+    buckets = MemoryBuckets()
+    assert [await buckets.take("ip:1", 1, capacity=3, refill_rate=1) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert await buckets.take("ip:1", 2, capacity=3, refill_rate=1) == pytest.approx(2.0)
+    assert await buckets.take("ip:2", 1, capacity=3, refill_rate=1) == 0.0
+    now[0] += 2
+    assert await buckets.take("ip:1", 2, capacity=3, refill_rate=1) == 0.0
+
+async def test_memory_bucket_caps_cost_at_capacity():
+    # A route costing more than the bucket holds is still reachable with a full bucket
+    assert await MemoryBuckets().take("ip:1", 10, capacity=5, refill_rate=1) == 0.0
+
+async def test_memory_buckets_drop_the_stalest_key():
+    buckets = MemoryBuckets(max_keys=2)
+    for key in ("a", "b", "a", "c"):
+        await buckets.take(key, 1, capacity=5, refill_rate=1)
+    assert list(buckets.buckets) == ["a", "c"]
+
+async def test_redis_buckets_share_one_budget():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis runs the Lua script through lupa
+    server = fakeredis.FakeServer()
+    first = RedisBuckets(fakeredis.FakeAsyncRedis(server=server))
+    second = RedisBuckets(fakeredis.FakeAsyncRedis(server=server))
+    assert [await bucket.take("ip:1", 1, capacity=2, refill_rate=0.5) for bucket in (first, second)] == [0.0, 0.0]
+    assert 0 < await first.take("ip:1", 1, capacity=2, refill_rate=0.5) <= 2.0
+    assert 0 < await first.client.pttl("ratelimit:ip:1") <= 4000
+
+async def test_requests_are_charged_to_both_ip_and_user(monkeypatch):
+    import server
+    from starlette.requests import Request
+    from starlette.responses import Response
+
+    monkeypatch.setattr(server, "rate_limiter", MemoryBuckets())
+    monkeypatch.setattr(server, "RATE_LIMIT_IP_CAPACITY", 10)
+    monkeypatch.setattr(server, "RATE_LIMIT_IP_REFILL_PER_SECOND", 0.001)
+    monkeypatch.setattr(server, "RATE_LIMIT_USER_CAPACITY", 6)
+    monkeypatch.setattr(server, "RATE_LIMIT_USER_REFILL_PER_SECOND", 0.001)
+
+    async def call_next(request):
+        return Response(status_code=200)
+
+    async def search(user_id, host="10.0.0.1"):
+        token = server.create_access_token({"sub": user_id})
+        request = Request({
+            "type": "http", "method": "GET", "path": "/api/search", "query_string": b"q=x",
+            "headers": [(b"authorization", f"Bearer {token}".encode())], "client": (host, 1234),
+            "route_template": "/api/search",
+        })
+        return (await server.rate_limit(request, call_next)).status_code
+
+    # One user runs out of their own bucket first
+    assert [await search("u1") for _ in range(7)] == [200] * 6 + [429]
+    # Other tokens from the same address share what is left of its bucket
+    assert [await search(f"u{n}") for n in range(2, 8)] == [200] * 4 + [429] * 2
+    # Another address is unaffected
+    assert await search("u9", host="10.0.0.2") == 200
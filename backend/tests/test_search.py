@@ -0,0 +1,66 @@
+from search import SearchIndex, stem, tokenize
+
+def make_doc(doc_id, title, genre="Drama", description="", rating=5.0):
+    return {"id": doc_id, "title": title, "genre": genre, "description": description, "rating": rating}
+
+def build_index():
+    index = SearchIndex()
+    index.add(make_doc("m1", "Inception", "Sci-Fi", "A thief who steals dreams"), "movie")
+    index.add(make_doc("m2", "Dreams", "Drama", "Eight stories by Kurosawa"), "movie")
+    index.add(make_doc("s1", "Dark", "Sci-Fi", "Time travel in a small town"), "series")
+    return index
+
+def test_tokenize_drops_stop_words_and_case():
+    assert tokenize("The Lord of the Rings") == ["lord", "rings"]
+
+def test_stem_folds_plurals_and_suffixes():
+    assert stem("dreams") == stem("dream")
+    assert stem("running") == "run"
+    assert stem("stories") == stem("story")
+
+def test_title_match_outranks_description_match():
+    results = build_index().search("dream", prefix=False)
+    assert [doc["id"] for doc in results] == ["m2", "m1"]
+
+def test_last_token_matches_as_prefix():
+    index = build_index()
+    assert [doc["id"] for doc in index.search("incep")] == ["m1"]
+    assert index.search("incep", prefix=False) == []
+
+def test_content_type_filter():
+    index = build_index()
+    assert [doc["id"] for doc in index.search("sci", content_type="series")] == ["s1"]
+
+def test_add_replaces_an_existing_document():
+    index = build_index()
+    index.add(make_doc("m1", "Memento", "Thriller"), "movie")
+    assert len(index) == 3
+    assert index.search("inception") == []
+    assert [doc["id"] for doc in index.search("memento")] == ["m1"]
+
+def test_remove_drops_postings():
+    index = build_index()
+    index.remove("s1")
+    index.remove("missing")
+    assert "s1" not in index.docs
+    assert index.search("travel") == []
+    assert "travel" not in index.postings
+
+def test_ranked_after_continues_without_repeats():
+    index = SearchIndex()
+    for n in range(10):
+        index.add(make_doc(f"m{n}", f"Star {n}", rating=n), "movie")
+    first = index.ranked("star", limit=4)
+    second = index.ranked("star", limit=4, after=first[-1][0])
+    ids = [doc["id"] for _, doc in first + second]
+    assert len(set(ids)) == 8
+    assert [doc["id"] for _, doc in second] == [doc["id"] for doc in index.search("star", limit=8)][4:]
+
+def test_inserts_after_warm_are_searchable():
+    index = build_index()
+    index.warm()
+    index.add(make_doc("m3", "Interstellar", "Sci-Fi"), "movie")
+    assert [doc["id"] for doc in index.search("interstellar")] == ["m3"]
+
+def test_suggest_returns_titles_only():
+    assert build_index().suggest("dar") == [{"id": "s1", "title": "Dark", "content_type": "series"}]
@@ -0,0 +1,278 @@
+"""
+Opt-in request tracing and slow-query profiling
+
+Spans live in a context variable, so code only has to wrap what it wants
+timed in span(); outside a sampled request span() does nothing. Finished
+traces are written as OTLP/JSON lines (one ExportTraceServiceRequest per
+trace), the format the OpenTelemetry collector's otlpjsonfile receiver
+reads. CommandTracer adds a client span for every Mongo command issued
+inside a trace (Motor copies the context onto its executor threads) and
+logs commands slower than a threshold together with their explain plan.
+"""
+
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from bson import json_util
+from pymongo import MongoClient, monitoring
+
+logger = logging.getLogger(__name__)
+
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+current_span = ContextVar("current_span", default=None)
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace, name: str, parent=None, kind: int = 1, attributes=None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+
+    def child(self, name: str, kind: int = 1, attributes=None):
+        return Span(self.trace, name, self, kind, attributes)
+
+    def finish(self, error: str = None):
+        self.end_ns = time.time_ns()
+        self.error = error
+        self.trace.spans.append(self)
+
+class Trace:
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans = []
+
+def otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class FileExporter:
+    """Appends one OTLP/JSON line per finished trace"""
+
+    def __init__(self, path: str, service_name: str):
+        self.path = path
+        self.service_name = service_name
+        self.file = open(path, "a", buffering=1)
+        self.lock = threading.Lock()
+
+    def export(self, trace: Trace):
+        spans = [
+            {
+                "traceId": trace.trace_id,
+                "spanId": span.span_id,
+                **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                "name": span.name,
+                "kind": span.kind,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [{"key": key, "value": otlp_value(value)} for key, value in span.attributes.items()],
+                "status": {"code": STATUS_ERROR, "message": span.error} if span.error else {"code": STATUS_OK},
+            }
+            for span in trace.spans
+        ]
+        line = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "netflix-clone.tracing"}, "spans": spans}],
+        }]})
+        with self.lock:
+            self.file.write(line + "\n")
+
+    def close(self):
+        self.file.close()
+
+class Tracer:
+    def __init__(self, sample_rate: float = 1.0):
+        self.sample_rate = sample_rate
+        self.exporter = None  # set when tracing is switched on
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    @contextmanager
+    def start_trace(self, name: str, **attributes):
+        """Root server span for one request; yields None when the request isn't sampled"""
+        if not self.enabled or random.random() >= self.sample_rate:
+            yield None
+            return
+        root = Span(Trace(), name, kind=SPAN_KIND_SERVER, attributes=attributes)
+        token = current_span.set(root)
+        error = None
+        try:
+            yield root
+        except Exception as exc:
+            error = repr(exc)
+            raise
+        finally:
+            current_span.reset(token)
+            root.finish(error)
+            self.exporter.export(root.trace)
+
+@contextmanager
+def span(name: str, **attributes):
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, attributes=attributes)
+    token = current_span.set(child)
+    error = None
+    try:
+        yield child
+    except Exception as exc:
+        error = repr(exc)
+        raise
+    finally:
+        current_span.reset(token)
+        child.finish(error)
+
+def traced(name: str):
+    """Run an async function (e.g. a FastAPI dependency) inside a span"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Commands an explain plan can be asked for
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+
+def query_shape(value):
+    """A filter or pipeline with its literal values replaced by "?": the same shape for every value queried"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # {"$in": [1, 2, 3]} and {"$in": [4]} are one shape; pipeline stages keep their order
+        shapes = []
+        for item in value:
+            shape = query_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return "?"
+
+class SlowQueryLog:
+    """Logs commands over threshold_ms and, at most once per shape per interval, their explain plan"""
+
+    def __init__(self, threshold_ms: float, url: str, explain_interval: float = 60.0, max_shapes: int = 1024):
+        self.threshold_ms = threshold_ms
+        self.url = url
+        self.explain_interval = explain_interval
+        self.max_shapes = max_shapes
+        # shape -> when it was last explained, oldest first
+        self.explained = {}
+        self.lock = threading.Lock()
+        self.client = None
+        # Explains run on their own thread and client, never on the request path;
+        # both are created on first use, inside the worker process
+        self.executor = None
+
+    def check(self, database: str, command_name: str, command: dict, duration_ms: float):
+        if duration_ms < self.threshold_ms:
+            return
+        collection = command.get(command_name)
+        logger.warning("Slow Mongo %s on %s.%s took %.1f ms: %s", command_name, database, collection,
+                       duration_ms, json_util.dumps(command)[:2000])
+        if command_name not in EXPLAINABLE:
+            return
+        query = command.get("filter") or command.get("query") or command.get("pipeline") or {}
+        shape = (database, command_name, collection, json_util.dumps(query_shape(query), sort_keys=True))
+        now = time.monotonic()
+        with self.lock:
+            if now - self.explained.get(shape, float("-inf")) < self.explain_interval:
+                return
+            self.explained.pop(shape, None)
+            # Forget shapes explained longer than an interval ago, then the oldest if still full
+            while self.explained:
+                oldest = next(iter(self.explained))
+                if now - self.explained[oldest] < self.explain_interval and len(self.explained) < self.max_shapes:
+                    break
+                del self.explained[oldest]
+            self.explained[shape] = now
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+        self.executor.submit(self.explain, database, command_name, command)
+
+    def explain(self, database: str, command_name: str, command: dict):
+        explainable = {key: value for key, value in command.items()
+                       if not key.startswith("$") and key not in ("lsid", "txnNumber")}
+        try:
+            if self.client is None:
+                self.client = MongoClient(self.url, serverSelectionTimeoutMS=2000)
+            plan = self.client[database].command({"explain": explainable, "verbosity": "queryPlanner"})
+        except Exception:
+            logger.exception("Explain for slow %s failed", command_name)
+            return
+        planner = plan.get("queryPlanner") or plan.get("stages", [{}])[0].get("$cursor", {}).get("queryPlanner", {})
+        logger.warning("Explain for slow %s on %s.%s: %s", command_name, database, command.get(command_name),
+                       json_util.dumps(planner.get("winningPlan", plan))[:4000])
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+class CommandTracer(monitoring.CommandListener):
+    """Client spans for Mongo commands inside a trace, plus slow-query logging"""
+
+    def __init__(self, slow_queries: SlowQueryLog = None):
+        self.slow_queries = slow_queries
+        self.pending = {}
+
+    def started(self, event):
+        parent = current_span.get()
+        child = None
+        if parent is not None:
+            collection = event.command.get(event.command_name)
+            child = parent.child(f"mongodb.{event.command_name}", SPAN_KIND_CLIENT, {
+                "db.system": "mongodb",
+                "db.name": event.database_name,
+                "db.operation": event.command_name,
+                "db.mongodb.collection": collection if isinstance(collection, str) else "",
+            })
+        if child is not None or self.slow_queries is not None:
+            self.pending[(event.connection_id, event.request_id)] = (child, event.database_name, event.command)
+
+    def succeeded(self, event):
+        self.finish(event)
+
+    def failed(self, event):
+        self.finish(event, str(event.failure))
+
+    def finish(self, event, error: str = None):
+        pending = self.pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        child, database, command = pending
+        if child is not None:
+            child.finish(error)
+        if self.slow_queries is not None:
+            self.slow_queries.check(database, event.command_name, command, event.duration_micros / 1000)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Watchlist layout benchmark
+Seeds one profile with N watchlist entries in both the old embedded layout
+(users.profiles.$.watchlist) and the watchlist_items collection, then times
+adds, removes and first-page reads against each. Uses a scratch database.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from bson import BSON
+from pymongo import MongoClient
+
+from server import INDEXES
+
+def timed(func, rounds):
+    latencies = []
+    for i in range(rounds):
+        started = time.perf_counter()
+        func(i)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {"p50_ms": round(latencies[len(latencies) // 2], 3),
+            "p95_ms": round(latencies[int(len(latencies) * 0.95)], 3)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--page", type=int, default=20)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    client = MongoClient(args.url)
+    client.drop_database("netflix_clone_bench")
+    db = client.netflix_clone_bench
+    for collection, indexes in INDEXES.items():
+        db[collection].create_indexes(indexes)
+
+    now = datetime.utcnow()
+    content_ids = [str(uuid4()) for _ in range(args.entries)]
+    db.content.insert_many([
+        {"id": content_id, "title": f"Title {i}", "genre": "Drama", "year": 2000, "rating": 3.0,
+         "image_url": "", "trailer_url": "", "duration": 100, "content_type": "movie"}
+        for i, content_id in enumerate(content_ids)
+    ])
+
+    # Old layout: everything embedded in the user document
+    db.users.insert_one({"id": "embedded-user", "profiles": [
+        {"id": "embedded-profile", "name": "Bench", "watchlist": content_ids}
+    ]})
+    # New layout: one row per entry
+    db.profiles.insert_one({"id": "split-profile", "user_id": "split-user", "name": "Bench", "created_at": now})
+    db.watchlist_items.insert_many([
+        {"profile_id": "split-profile", "content_id": content_id, "content_type": "movie",
+         "added_at": now - timedelta(seconds=i)}
+        for i, content_id in enumerate(content_ids)
+    ])
+
+    def embedded_add(i):
+        db.users.update_one({"id": "embedded-user", "profiles.id": "embedded-profile"},
+                            {"$addToSet": {"profiles.$.watchlist": f"new-{i}"}})
+
+    def embedded_remove(i):
+        db.users.update_one({"id": "embedded-user", "profiles.id": "embedded-profile"},
+                            {"$pull": {"profiles.$.watchlist": f"new-{i}"}})
+
+    def embedded_read(_):
+        user = db.users.find_one({"id": "embedded-user"})
+        ids = user["profiles"][0]["watchlist"]
+        list(db.content.find({"id": {"$in": ids}}))
+
+    def split_add(i):
+        db.watchlist_items.update_one({"profile_id": "split-profile", "content_id": f"new-{i}"},
+                                      {"$setOnInsert": {"content_type": "movie", "added_at": datetime.utcnow()}},
+                                      upsert=True)
+
+    def split_remove(i):
+        db.watchlist_items.delete_one({"profile_id": "split-profile", "content_id": f"new-{i}"})
+
+    def split_read(_):
+        items = list(db.watchlist_items.find({"profile_id": "split-profile"})
+                     .sort([("added_at", -1), ("content_id", -1)]).limit(args.page))
+        list(db.content.find({"id": {"$in": [item["content_id"] for item in items]}}))
+
+    results = {
+        "entries": args.entries,
+        "embedded_user_doc_bytes": len(BSON.encode(db.users.find_one({"id": "embedded-user"}))),
+        "embedded": {
+            "add": timed(embedded_add, args.rounds),
+            "remove": timed(embedded_remove, args.rounds),
+            "read_full_watchlist": timed(embedded_read, max(1, args.rounds // 10)),
+        },
+        "split": {
+            "add": timed(split_add, args.rounds),
+            "remove": timed(split_remove, args.rounds),
+            f"read_page_of_{args.page}": timed(split_read, args.rounds),
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    client.drop_database("netflix_clone_bench")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Netflix Clone Backend Load Benchmark
+Drives concurrent read traffic against a running backend and reports requests/sec
+
+Run it once against the old build and once against the new one (same local
+mongod, same seeded catalog) to compare throughput of a single worker.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DEFAULT_ENDPOINTS = [
+    "movies",
+    "series",
+    "movies?genre=Action",
+    "search?q=the",
+]
+
+class LoadBenchmark:
+    def __init__(self, base_url: str = "http://localhost:8001", concurrency: int = 50,
+                 requests_per_endpoint: int = 2000):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.requests_per_endpoint = requests_per_endpoint
+        self.results = []
+
+    def hit(self, session: requests.Session, endpoint: str) -> bool:
+        """Issue a single GET and report whether it succeeded"""
+        try:
+            response = session.get(f"{self.base_url}/api/{endpoint}", timeout=30)
+            return response.status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def run_endpoint(self, endpoint: str) -> dict:
+        """Hammer one endpoint with `concurrency` workers"""
+        per_worker = max(1, self.requests_per_endpoint // self.concurrency)
+
+        def worker(_):
+            session = requests.Session()
+            ok = 0
+            for _ in range(per_worker):
+                if self.hit(session, endpoint):
+                    ok += 1
+            return ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            succeeded = sum(pool.map(worker, range(self.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        total = per_worker * self.concurrency
+        result = {
+            "endpoint": endpoint,
+            "requests": total,
+            "errors": total - succeeded,
+            "seconds": round(elapsed, 3),
+            "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        }
+        print(f"{endpoint:<30} {result['rps']:>10} req/s  ({result['errors']} errors)")
+        self.results.append(result)
+        return result
+
+    def run(self, endpoints) -> list:
+        print(f"🚀 Benchmarking {self.base_url} with {self.concurrency} concurrent clients")
+        print("=" * 60)
+        for endpoint in endpoints:
+            self.run_endpoint(endpoint)
+        return self.results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=os.environ.get("REACT_APP_BACKEND_URL", "http://localhost:8001"))
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint")
+    parser.add_argument("--endpoint", action="append", help="endpoint to hit (repeatable)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    benchmark = LoadBenchmark(args.url, args.concurrency, args.requests)
+    results = benchmark.run(args.endpoint or DEFAULT_ENDPOINTS)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(r["errors"] == 0 for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
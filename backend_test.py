@@ -16,6 +16,7 @@ class NetflixAPITester:
         self.token = None
         self.user_id = None
         self.profile_id = None
+        self.movie_id = None
         self.tests_run = 0
         self.tests_passed = 0
         self.test_results = []
@@ -213,6 +214,7 @@ class NetflixAPITester:
         success, response = self.make_request('POST', 'movies', movie_data)
         
         if success and 'id' in response:
+            self.movie_id = response['id']
             self.log_test("Add Movie", True, f"Movie ID: {response['id']}")
             return True
         else:
@@ -257,6 +259,120 @@ class NetflixAPITester:
             self.log_test("Remove from Watchlist", False, str(response))
             return False
 
+    def test_bulk_ingest(self):
+        """Test NDJSON bulk ingestion: valid rows are written, invalid ones reported by line"""
+        stamp = datetime.now().strftime('%H%M%S%f')
+        rows = [
+            {"id": f"bulk-{stamp}-1", "title": "Bulk Movie One", "description": "Imported", "genre": "Drama",
+             "year": 2020, "rating": 7.0, "image_url": "", "trailer_url": "", "duration": 100},
+            {"id": f"bulk-{stamp}-2", "title": "Bulk Movie Two", "description": "Imported", "genre": "Drama",
+             "year": 2021, "rating": 7.5, "image_url": "", "trailer_url": "", "duration": 110},
+            {"title": "Missing fields"},
+        ]
+        body = "\n".join(json.dumps(row) for row in rows) + "\n"
+        try:
+            response = requests.post(
+                f"{self.base_url}/api/movies/bulk",
+                data=body.encode(),
+                headers={'Content-Type': 'application/x-ndjson', 'Authorization': f'Bearer {self.token}'},
+                timeout=10,
+            )
+            result = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.log_test("Bulk Ingest", False, str(e))
+            return False
+
+        success = (response.status_code == 200 and result.get('received') == 3
+                   and result.get('inserted') == 2 and result.get('failed') == 1
+                   and result['errors'][0]['line'] == 3)
+        self.log_test("Bulk Ingest", success, str(result))
+        return success
+
+    def test_content_batch(self):
+        """Test fetching several titles in one request, with unknown ids reported as missing"""
+        success, movies = self.make_request('GET', 'movies?limit=3')
+        if not success or not movies:
+            self.log_test("Content Batch", False, "No movies available for testing")
+            return False
+
+        ids = [movie['id'] for movie in movies] + ['no-such-title']
+        success, response = self.make_request('POST', 'content/batch', {"ids": ids})
+        success = (success and [item['id'] for item in response.get('items', [])] == ids[:-1]
+                   and response.get('missing') == ['no-such-title'])
+        self.log_test("Content Batch", success, f"{len(response.get('items', []))} found" if success else str(response))
+        return success
+
+    def test_browse_rows(self):
+        """Test the aggregated Browse rows endpoint"""
+        success, response = self.make_request('GET', f'browse?profile_id={self.profile_id}')
+        rows = response.get('rows') if success else None
+        if isinstance(rows, list) and all('title' in row and 'items' in row for row in rows):
+            self.log_test("Browse Rows", True, f"{len(rows)} rows")
+            return True
+        self.log_test("Browse Rows", False, str(response))
+        return False
+
+    def test_playback_progress(self):
+        """Test that a heartbeat shows up in Continue Watching straight away"""
+        if not self.profile_id or not self.movie_id:
+            self.log_test("Playback Progress", False, "No profile or movie available")
+            return False
+
+        heartbeat = {"profile_id": self.profile_id, "content_id": self.movie_id, "position": 600, "duration": 7200}
+        success, response = self.make_request('POST', 'progress', heartbeat, expected_status=204)
+        if not success:
+            self.log_test("Playback Progress", False, str(response))
+            return False
+
+        success, items = self.make_request('GET', f'continue-watching/{self.profile_id}')
+        entry = next((item for item in items if item.get('id') == self.movie_id), None) if success else None
+        success = entry is not None and entry['position'] == 600
+        self.log_test("Playback Progress", success, "Listed in Continue Watching" if success else str(items))
+        return success
+
+    def test_recommendations(self):
+        """Test recommendations for a profile with something on its watchlist"""
+        if not self.profile_id or not self.movie_id:
+            self.log_test("Recommendations", False, "No profile or movie available")
+            return False
+
+        self.make_request('POST', f'watchlist/{self.profile_id}/{self.movie_id}')
+        success, response = self.make_request('GET', f'recommendations/{self.profile_id}')
+        self.make_request('DELETE', f'watchlist/{self.profile_id}/{self.movie_id}')
+        success = success and isinstance(response, list) and all(item['id'] != self.movie_id for item in response)
+        self.log_test("Recommendations", success, f"{len(response)} titles" if success else str(response))
+        return success
+
+    def test_event_stream(self):
+        """Test opening the event stream with a short-lived token, as a browser EventSource does"""
+        success, response = self.make_request('POST', 'events/token')
+        if not success or 'token' not in response:
+            self.log_test("Event Stream", False, str(response))
+            return False
+
+        try:
+            with requests.get(
+                f"{self.base_url}/api/events",
+                params={"token": response['token'], "profile_id": self.profile_id},
+                stream=True,
+                timeout=10,
+            ) as stream:
+                first = next(stream.iter_lines(decode_unicode=True), "") if stream.status_code == 200 else ""
+                success = (stream.status_code == 200
+                           and stream.headers.get('content-type', '').startswith('text/event-stream')
+                           and first.startswith('retry:'))
+                details = f"status {stream.status_code}, first line {first!r}"
+        except requests.exceptions.RequestException as e:
+            success, details = False, str(e)
+
+        # The stream token must not work as a regular bearer token
+        saved_token, self.token = self.token, response['token']
+        rejected, _ = self.make_request('GET', 'auth/me', expected_status=401)
+        self.token = saved_token
+
+        self.log_test("Event Stream", success and rejected, details)
+        return success and rejected
+
     def run_all_tests(self):
         """Run all API tests"""
         print("🚀 Starting Netflix Clone Backend API Tests")
@@ -274,8 +390,17 @@ class NetflixAPITester:
             self.test_search_content,
             self.test_add_movie,
             self.test_watchlist_operations,
+            self.test_bulk_ingest,
+            self.test_content_batch,
+            self.test_browse_rows,
+            self.test_playback_progress,
+            self.test_recommendations,
+            self.test_event_stream,
         ]
 
+        self.test_health_check()
+        self.test_user_registration()
+
         # If registration fails, try login
         if not self.token:
             print("\n🔄 Registration failed, trying login with test credentials...")
@@ -1,4 +1,9 @@
 import React, { useState, useRef, useEffect } from 'react';
+import { useAuth } from '../contexts/AuthContext';
+import { progressAPI } from '../services/api';
+
+// Seconds between progress heartbeats while playing; the server batches them
+const HEARTBEAT_SECONDS = 10;
 
 function VideoPlayer({ content, onClose }) {
   const [isPlaying, setIsPlaying] = useState(false);
@@ -8,12 +13,40 @@ function VideoPlayer({ content, onClose }) {
   const [showControls, setShowControls] = useState(true);
   const videoRef = useRef(null);
   const controlsTimeoutRef = useRef(null);
+  const { currentProfile } = useAuth();
+
+  const sendProgress = (video) => {
+    if (!video || !currentProfile || !video.duration || !isFinite(video.duration)) {
+      return;
+    }
+    progressAPI
+      .sendHeartbeat(currentProfile.id, content.id, video.currentTime, video.duration)
+      .catch((error) => console.error('Failed to save progress:', error));
+  };
+
+  useEffect(() => {
+    if (!isPlaying) {
+      return undefined;
+    }
+    // Held here because the ref is already cleared when the player unmounts
+    const video = videoRef.current;
+    const interval = setInterval(() => sendProgress(video), HEARTBEAT_SECONDS * 1000);
+    return () => {
+      clearInterval(interval);
+      // Paused, closed or switched title: record where playback stopped
+      sendProgress(video);
+    };
+  }, [isPlaying, content.id, currentProfile]);
 
   useEffect(() => {
     const video = videoRef.current;
     if (video) {
       video.addEventListener('loadedmetadata', () => {
         setDuration(video.duration);
+        // Continue watching entries carry the saved position
+        if (content.position) {
+          video.currentTime = content.position;
+        }
       });
       
       video.addEventListener('timeupdate', () => {
@@ -4,36 +4,34 @@ import Navbar from '../components/Navbar';
 import ContentRow from '../components/ContentRow';
 import VideoPlayer from '../components/VideoPlayer';
 import LoadingSpinner from '../components/LoadingSpinner';
-import { movieAPI, seriesAPI } from '../services/api';
+import { browseAPI } from '../services/api';
+import { subscribeToEvents } from '../services/events';
 
 function Browse() {
   const { currentProfile } = useAuth();
-  const [movies, setMovies] = useState([]);
-  const [series, setSeries] = useState([]);
+  const [rows, setRows] = useState([]);
   const [featuredContent, setFeaturedContent] = useState(null);
   const [currentVideo, setCurrentVideo] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     loadContent();
-  }, []);
+  }, [currentProfile]);
+
+  // New titles and watchlist changes refresh the rows in place
+  useEffect(() => {
+    if (!currentProfile) {
+      return undefined;
+    }
+    return subscribeToEvents(currentProfile.id, () => loadContent());
+  }, [currentProfile]);
 
   const loadContent = async () => {
     try {
-      const [moviesRes, seriesRes] = await Promise.all([
-        movieAPI.getMovies(null, 20),
-        seriesAPI.getSeries(null, 20)
-      ]);
-
-      setMovies(moviesRes.data);
-      setSeries(seriesRes.data);
-      
-      // Set featured content (first movie or series)
-      if (moviesRes.data.length > 0) {
-        setFeaturedContent(moviesRes.data[0]);
-      } else if (seriesRes.data.length > 0) {
-        setFeaturedContent(seriesRes.data[0]);
-      }
+      // All rows come back from one request, already grouped server-side
+      const response = await browseAPI.getRows(currentProfile?.id);
+      setRows(response.data.rows);
+      setFeaturedContent(response.data.featured);
     } catch (error) {
       console.error('Failed to load content:', error);
     } finally {
@@ -57,16 +55,6 @@ function Browse() {
     return <LoadingSpinner message="Please select a profile..." />;
   }
 
-  // Group content by genres
-  const actionMovies = movies.filter(movie => movie.genre.toLowerCase().includes('action'));
-  const comedyMovies = movies.filter(movie => movie.genre.toLowerCase().includes('comedy'));
-  const dramaMovies = movies.filter(movie => movie.genre.toLowerCase().includes('drama'));
-  const horrorMovies = movies.filter(movie => movie.genre.toLowerCase().includes('horror'));
-  
-  const actionSeries = series.filter(serie => serie.genre.toLowerCase().includes('action'));
-  const comedySeries = series.filter(serie => serie.genre.toLowerCase().includes('comedy'));
-  const dramaSeries = series.filter(serie => serie.genre.toLowerCase().includes('drama'));
-
   return (
     <div className="min-h-screen bg-netflix-black">
       <Navbar />
@@ -122,36 +110,9 @@ function Browse() {
 
       {/* Content Rows */}
       <div className="relative z-10 -mt-32 pb-12">
-        <ContentRow title="Trending Movies" content={movies.slice(0, 10)} onPlay={handlePlay} />
-        <ContentRow title="Popular Series" content={series.slice(0, 10)} onPlay={handlePlay} />
-        
-        {actionMovies.length > 0 && (
-          <ContentRow title="Action Movies" content={actionMovies} onPlay={handlePlay} />
-        )}
-        
-        {comedyMovies.length > 0 && (
-          <ContentRow title="Comedy Movies" content={comedyMovies} onPlay={handlePlay} />
-        )}
-        
-        {dramaMovies.length > 0 && (
-          <ContentRow title="Drama Movies" content={dramaMovies} onPlay={handlePlay} />
-        )}
-        
-        {horrorMovies.length > 0 && (
-          <ContentRow title="Horror Movies" content={horrorMovies} onPlay={handlePlay} />
-        )}
-        
-        {actionSeries.length > 0 && (
-          <ContentRow title="Action Series" content={actionSeries} onPlay={handlePlay} />
-        )}
-        
-        {comedySeries.length > 0 && (
-          <ContentRow title="Comedy Series" content={comedySeries} onPlay={handlePlay} />
-        )}
-        
-        {dramaSeries.length > 0 && (
-          <ContentRow title="Drama Series" content={dramaSeries} onPlay={handlePlay} />
-        )}
+        {rows.map((row) => (
+          <ContentRow key={row.key} title={row.title} content={row.items} onPlay={handlePlay} />
+        ))}
       </div>
 
       {/* Video Player Modal */}
@@ -4,13 +4,16 @@ import Navbar from '../components/Navbar';
 import MovieCard from '../components/MovieCard';
 import VideoPlayer from '../components/VideoPlayer';
 import LoadingSpinner from '../components/LoadingSpinner';
-import { watchlistAPI } from '../services/api';
+import { watchlistAPI, nextCursor } from '../services/api';
+import { subscribeToEvents } from '../services/events';
 
 function Watchlist() {
   const { currentProfile } = useAuth();
   const [watchlist, setWatchlist] = useState([]);
   const [loading, setLoading] = useState(true);
   const [currentVideo, setCurrentVideo] = useState(null);
+  const [cursor, setCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     if (currentProfile) {
@@ -18,18 +21,45 @@ function Watchlist() {
     }
   }, [currentProfile]);
 
+  // Changes made on other devices (or tabs) show up without a reload
+  useEffect(() => {
+    if (!currentProfile) {
+      return undefined;
+    }
+    return subscribeToEvents(currentProfile.id, (type) => {
+      if (type !== 'title.added') {
+        loadWatchlist();
+      }
+    });
+  }, [currentProfile]);
+
   const loadWatchlist = async () => {
     try {
       const response = await watchlistAPI.getWatchlist(currentProfile.id);
       setWatchlist(response.data);
+      setCursor(nextCursor(response));
     } catch (error) {
       console.error('Failed to load watchlist:', error);
       setWatchlist([]);
+      setCursor(null);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await watchlistAPI.getWatchlist(currentProfile.id, undefined, cursor);
+      setWatchlist((items) => [...items, ...response.data]);
+      setCursor(nextCursor(response));
+    } catch (error) {
+      console.error('Failed to load more of the watchlist:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handlePlay = (content) => {
     setCurrentVideo(content);
   };
@@ -63,12 +93,12 @@ function Watchlist() {
           <div className="mb-8">
             <h1 className="text-3xl font-bold text-white mb-2">My List</h1>
             <p className="text-gray-400">
-              {currentProfile.name}'s watchlist • {watchlist.length} {watchlist.length === 1 ? 'title' : 'titles'}
+              {currentProfile.name}'s watchlist • {watchlist.length}{cursor ? '+' : ''} {watchlist.length === 1 && !cursor ? 'title' : 'titles'}
             </p>
           </div>
 
           {/* Watchlist Content */}
-          {watchlist.length > 0 ? (
+          {watchlist.length > 0 && (
             <div className="content-grid">
               {watchlist.map((content) => (
                 <MovieCard
@@ -78,7 +108,17 @@ function Watchlist() {
                 />
               ))}
             </div>
-          ) : (
+          )}
+
+          {cursor && (
+            <div className="text-center py-8">
+              <button onClick={loadMore} disabled={loadingMore} className="netflix-button">
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
+
+          {watchlist.length === 0 && (
             <div className="text-center py-20">
               <svg className="w-24 h-24 text-gray-600 mx-auto mb-6" fill="none" stroke="currentColor" viewBox="0 0 24 24">
                 <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16" />
@@ -39,6 +39,9 @@ api.interceptors.response.use(
 
 export default api;
 
+// Paginated endpoints return the next page's cursor in this header (absent on the last page)
+export const nextCursor = (response) => response.headers['x-next-cursor'] || null;
+
 // API service functions
 export const authAPI = {
   login: (email, password) => api.post('/auth/login', { email, password }),
@@ -52,22 +55,48 @@ export const profileAPI = {
 };
 
 export const movieAPI = {
-  getMovies: (genre, limit) => api.get('/movies', { params: { genre, limit } }),
+  getMovies: (genre, limit, cursor) => api.get('/movies', { params: { genre, limit, cursor } }),
   getMovie: (id) => api.get(`/movies/${id}`),
   addMovie: (movie) => api.post('/movies', movie),
 };
 
 export const seriesAPI = {
-  getSeries: (genre, limit) => api.get('/series', { params: { genre, limit } }),
+  getSeries: (genre, limit, cursor) => api.get('/series', { params: { genre, limit, cursor } }),
+  getSeriesById: (id) => api.get(`/series/${id}`),
   addSeries: (series) => api.post('/series', series),
 };
 
+export const contentAPI = {
+  getBatch: (ids, view) => api.post('/content/batch', { ids, view }),
+};
+
+export const browseAPI = {
+  getRows: (profile_id, row_size) => api.get('/browse', { params: { profile_id, row_size } }),
+};
+
 export const searchAPI = {
-  searchContent: (query, content_type) => api.get('/search', { params: { q: query, content_type } }),
+  searchContent: (query, content_type, limit, cursor) => api.get('/search', { params: { q: query, content_type, limit, cursor } }),
+  suggest: (query, content_type) => api.get('/search/suggest', { params: { q: query, content_type } }),
 };
 
 export const watchlistAPI = {
   addToWatchlist: (profile_id, content_id) => api.post(`/watchlist/${profile_id}/${content_id}`),
   removeFromWatchlist: (profile_id, content_id) => api.delete(`/watchlist/${profile_id}/${content_id}`),
-  getWatchlist: (profile_id) => api.get(`/watchlist/${profile_id}`),
-};
\ No newline at end of file
+  getWatchlist: (profile_id, limit, cursor) => api.get(`/watchlist/${profile_id}`, { params: { limit, cursor } }),
+};
+
+export const eventsAPI = {
+  // Short-lived token for /events: EventSource cannot send the Authorization header
+  getToken: () => api.post('/events/token'),
+  streamURL: (token, profile_id, last_event_id) => {
+    const params = new URLSearchParams({ token });
+    if (profile_id) params.set('profile_id', profile_id);
+    if (last_event_id) params.set('last_event_id', last_event_id);
+    return `${BACKEND_URL}/api/events?${params}`;
+  },
+};
+
+export const progressAPI = {
+  sendHeartbeat: (profile_id, content_id, position, duration) => api.post('/progress', { profile_id, content_id, position, duration }),
+  getContinueWatching: (profile_id, limit) => api.get(`/continue-watching/${profile_id}`, { params: { limit } }),
+};
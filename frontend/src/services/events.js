@@ -0,0 +1,56 @@
+import { eventsAPI } from './api';
+
+const EVENT_TYPES = ['title.added', 'watchlist.added', 'watchlist.removed', 'resync'];
+const RECONNECT_DELAY_MS = 5000;
+
+// Opens the server's event stream and calls onEvent(type, data) for each event.
+// The browser reconnects dropped streams by itself, but the stream token is only
+// good for a minute, so once the server refuses a reconnect this opens a new
+// stream with a fresh token, resuming after the last event seen.
+// Returns a function that closes the stream.
+export function subscribeToEvents(profileId, onEvent) {
+  let source = null;
+  let lastEventId = null;
+  let retryTimer = null;
+  let closed = false;
+
+  const reconnect = () => {
+    if (!closed) {
+      retryTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+    }
+  };
+
+  const connect = async () => {
+    try {
+      const response = await eventsAPI.getToken();
+      if (closed) {
+        return;
+      }
+      source = new EventSource(eventsAPI.streamURL(response.data.token, profileId, lastEventId));
+      EVENT_TYPES.forEach((type) => {
+        source.addEventListener(type, (event) => {
+          lastEventId = event.lastEventId || lastEventId;
+          onEvent(type, event.data ? JSON.parse(event.data) : null);
+        });
+      });
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+          source = null;
+          reconnect();
+        }
+      };
+    } catch (error) {
+      console.error('Failed to open the event stream:', error);
+      reconnect();
+    }
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    if (source) {
+      source.close();
+    }
+  };
+}
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Catalog importer
+Streams a local NDJSON feed (one movie or series per line) to the bulk
+ingestion endpoints in chunks, retrying chunks that fail on the network or
+with a 429/5xx, and writes every rejected row to an NDJSON error report.
+
+Rows without an id are given one before their first upload so a retried
+chunk upserts the same titles instead of duplicating them.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from uuid import uuid4
+
+import requests
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class ImportAborted(Exception):
+    pass
+
+def read_chunks(path, chunk_size, report):
+    """Yield lists of (file line number, encoded row) from the feed"""
+    chunk = []
+    with open(path, "rb") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                report(line_number, None, f"Invalid JSON: {exc}")
+                continue
+            if isinstance(row, dict) and not row.get("id"):
+                row["id"] = str(uuid4())
+            chunk.append((line_number, json.dumps(row)))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+def upload(session, url, chunk, retries, timeout):
+    body = "\n".join(row for _, row in chunk).encode()
+    for attempt in range(retries + 1):
+        try:
+            response = session.post(url, data=body, timeout=timeout,
+                                    headers={"Content-Type": "application/x-ndjson"})
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            error, delay = str(exc), min(2 ** attempt, 30)
+        else:
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code not in RETRY_STATUSES:
+                raise ImportAborted(f"{response.status_code}: {response.text}")
+            error = f"HTTP {response.status_code}"
+            delay = float(response.headers.get("Retry-After") or min(2 ** attempt, 30))
+        if attempt < retries:
+            print(f"⚠️  {error}, retrying in {delay:.0f}s ({attempt + 1}/{retries})")
+            time.sleep(delay)
+    raise ImportAborted(f"chunk failed after {retries} retries: {error}")
+
+def login(base_url, email, password):
+    response = requests.post(f"{base_url}/auth/login", json={"email": email, "password": password})
+    if response.status_code != 200:
+        raise ImportAborted(f"login failed: {response.text}")
+    return response.json()["access_token"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("file", help="NDJSON feed, one title per line")
+    parser.add_argument("--type", choices=["movies", "series"], required=True)
+    parser.add_argument("--url", default="http://localhost:8001/api")
+    parser.add_argument("--token", default=os.environ.get("IMPORT_TOKEN"), help="bearer token (or IMPORT_TOKEN)")
+    parser.add_argument("--email", help="log in with these credentials instead of --token")
+    parser.add_argument("--password")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows per request")
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--report", help="error report path (default: <file>.errors.ndjson)")
+    args = parser.parse_args()
+
+    report_path = args.report or f"{args.file}.errors.ndjson"
+    totals = {"received": 0, "inserted": 0, "updated": 0, "failed": 0}
+    started = time.perf_counter()
+
+    with open(report_path, "w") as report_file:
+        def report(line_number, content_id, error):
+            report_file.write(json.dumps({"line": line_number, "id": content_id, "error": error}) + "\n")
+            totals["failed"] += 1
+
+        try:
+            token = login(args.url, args.email, args.password) if args.email else args.token
+            if not token:
+                raise ImportAborted("pass --token, IMPORT_TOKEN or --email/--password")
+            session = requests.Session()
+            session.headers["Authorization"] = f"Bearer {token}"
+
+            for chunk in read_chunks(args.file, args.chunk_size, report):
+                result = upload(session, f"{args.url}/{args.type}/bulk", chunk, args.retries, args.timeout)
+                for key in ("received", "inserted", "updated"):
+                    totals[key] += result[key]
+                # Server line numbers are relative to the chunk
+                for error in result["errors"]:
+                    report(chunk[error["line"] - 1][0], error["id"], error["error"])
+                unreported = result["failed"] - len(result["errors"])
+                if unreported:
+                    totals["failed"] += unreported
+                    print(f"⚠️  {unreported} rejected rows in this chunk were not itemised; lower --chunk-size")
+
+                elapsed = time.perf_counter() - started
+                print(f"  {totals['received']} rows sent, {totals['inserted']} inserted, "
+                      f"{totals['updated']} updated, {totals['failed']} failed "
+                      f"({totals['received'] / elapsed:.0f} rows/s)")
+        except ImportAborted as exc:
+            print(f"❌ Import aborted: {exc}")
+            return 2
+
+    elapsed = time.perf_counter() - started
+    print(f"{'✅' if not totals['failed'] else '⚠️ '} Imported {totals['inserted'] + totals['updated']} "
+          f"{args.type} in {elapsed:.1f}s, {totals['failed']} rejected (see {report_path})")
+    return 1 if totals["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())